@@ -0,0 +1,10 @@
+from analytics.google_doc import GoogleDoc
+from analytics.ladder import Ladder
+from analytics.ladder_fetcher import TokenBucket
+from analytics.ladder_history import LadderHistory, open_history
+from analytics.leagues import LeagueComparison, load_leagues
+from analytics.memory_report import memory_report
+from analytics.reference import ReferenceData, load_reference
+from analytics.shared_cache import SharedCache
+from analytics.sheet_ladder_join import SheetLadderJoin, open_join, prepare_join
+from analytics.snapshot_store import SnapshotStore
@@ -0,0 +1,4 @@
+from analytics.cli import main
+
+
+main()
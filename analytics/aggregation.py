@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+from analytics.combination_cube import CombinationCube
+from analytics.lazy_tables import LazyTables
+
+
+
+
+class GoogleDocAggregates(LazyTables):
+
+    derived = {
+        "total_rows": ("count_players", []),
+        "nunique_players": ("count_players", []),
+        "boss_sums": ("sum_bosses", []),
+        "boss_counts": ("sum_bosses", []),
+        "coin_totals": ("sum_bosses", []),
+        "sorted_coin_totals": ("sort_coin_totals", ["coin_totals"]),
+        "reroll_counts": ("count_rerolls", []),
+        "cube": ("count_combinations", [])
+    }
+
+
+    def __init__(self, df_origin: pd.DataFrame, bosses_columns: list) -> None:
+
+        self.df_origin = df_origin
+        self.bosses_columns = bosses_columns
+
+        self.class_dtype = df_origin["Подкласс"].dtype
+        self.ability_dtype = df_origin["Умение"].dtype
+        self.reroll_dtype = df_origin["Был реролл"].dtype
+
+
+
+
+    def count_players(self):
+
+        _, logins = pd.factorize(self.df_origin["Логин"])
+
+        self.total_rows = len(self.df_origin)
+        self.nunique_players = len(logins)
+
+
+
+
+    def sum_bosses(self):
+
+        boss_matrix = self.df_origin[self.bosses_columns].to_numpy(dtype = np.float64)
+        is_killed = ~np.isnan(boss_matrix)
+        coins = np.where(is_killed, boss_matrix, 0.0)
+
+        self.boss_sums = coins.sum(axis = 0)
+        self.boss_counts = is_killed.sum(axis = 0)
+        self.coin_totals = coins.sum(axis = 1)
+
+
+
+
+    def sort_coin_totals(self):
+
+        self.sorted_coin_totals = np.sort(self.coin_totals)
+
+
+
+
+    def count_players_with_coins(self, threshold: float) -> int:
+
+        return len(self.sorted_coin_totals) - int(
+            np.searchsorted(self.sorted_coin_totals, threshold, side = "left")
+        )
+
+
+
+
+    def coins_percentile(self, percent: float) -> float:
+
+        if not len(self.sorted_coin_totals):
+            return 0.0
+
+        position = int(np.ceil(percent / 100 * len(self.sorted_coin_totals))) - 1
+
+        return float(
+            self.sorted_coin_totals[min(max(position, 0), len(self.sorted_coin_totals) - 1)]
+        )
+
+
+
+
+    def count_rerolls(self):
+
+        reroll_codes = self.df_origin["Был реролл"].cat.codes.to_numpy()
+
+        self.reroll_counts = np.bincount(
+            reroll_codes[reroll_codes >= 0],
+            minlength = len(self.reroll_dtype.categories)
+        )
+
+
+
+
+    def count_combinations(self):
+
+        self.cube = CombinationCube(
+            self.df_origin["Подкласс"].cat.codes.to_numpy(),
+            self.df_origin["Умение"].cat.codes.to_numpy(),
+            self.class_dtype,
+            self.ability_dtype
+        )
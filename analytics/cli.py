@@ -0,0 +1,182 @@
+import argparse
+import cProfile
+import os
+import pstats
+
+from analytics.google_doc import GoogleDoc
+from analytics.instrumentation import instrumentation
+from analytics.ladder import Ladder
+from analytics.ladder_columns import LadderColumns
+from analytics.leagues import LeagueComparison, load_leagues
+from analytics.memory_report import memory_report
+from analytics.reference import load_reference
+from analytics.sheet_ladder_join import SheetLadderJoin
+from analytics.sheet_loaders import LOADERS, SHEET_ENGINE
+
+
+
+
+def build_parser() -> argparse.ArgumentParser:
+
+    parser = argparse.ArgumentParser(
+        prog = "python -m analytics",
+        description = "Compute every Google Doc and ladder table without Streamlit"
+    )
+    parser.add_argument(
+        "--sheet",
+        help = "local xlsx/csv export to read instead of downloading the Google Doc"
+    )
+    parser.add_argument(
+        "--engine",
+        default = SHEET_ENGINE,
+        choices = ["auto", *LOADERS],
+        help = "sheet parsing engine"
+    )
+    parser.add_argument(
+        "--league",
+        nargs = "+",
+        default = [Ladder.league_id],
+        help = "ladder league ids, several leagues are fetched concurrently and compared"
+    )
+    parser.add_argument(
+        "--drop-columns",
+        nargs = "+",
+        default = [],
+        choices = LadderColumns.optional_columns,
+        help = "ladder columns not to keep in memory"
+    )
+    parser.add_argument(
+        "--memory",
+        action = "store_true",
+        help = "print the memory used by every loaded frame"
+    )
+    parser.add_argument(
+        "--metrics",
+        nargs = "+",
+        default = [],
+        metavar = "PATH",
+        help = "write per-stage timings to PATH, as json when it ends with .json and in prometheus text format otherwise"
+    )
+    parser.add_argument(
+        "--skip-google-doc",
+        action = "store_true"
+    )
+    parser.add_argument(
+        "--skip-ladder",
+        action = "store_true"
+    )
+    parser.add_argument(
+        "--output",
+        help = "directory to write every table to as csv instead of printing"
+    )
+    parser.add_argument(
+        "--profile",
+        type = int,
+        metavar = "N",
+        help = "run under cProfile and print the N most expensive calls"
+    )
+
+    return parser
+
+
+
+
+def compute(args) -> dict:
+
+    results = {}
+
+    if not args.skip_google_doc:
+
+        results["google_doc"] = GoogleDoc(
+            load_reference(),
+            path = args.sheet,
+            engine = args.engine
+        )
+
+    if not args.skip_ladder:
+
+        if len(args.league) == 1:
+
+            results["ladder"] = Ladder(
+                league_id = args.league[0],
+                drop_columns = args.drop_columns
+            )
+
+        else:
+
+            ladders = load_leagues(
+                args.league,
+                drop_columns = args.drop_columns
+            )
+
+            for league_id, ladder in ladders.items():
+                results[f"ladder:{league_id}"] = ladder
+
+            results["leagues"] = LeagueComparison(ladders)
+
+    if "google_doc" in results and "ladder" in results:
+
+        results["join"] = SheetLadderJoin(
+            results["google_doc"],
+            results["ladder"]
+        )
+
+    return results
+
+
+
+
+def report(results: dict, output: "str | None", memory: bool = False):
+
+    if output:
+        os.makedirs(output, exist_ok = True)
+
+    for source, data in results.items():
+
+        for name, value in data.metrics().items():
+            print(f"{source}.{name}: {value}")
+
+        for name, df in data.tables().items():
+
+            if output:
+
+                df.to_csv(
+                    os.path.join(output, f"{source}.{name}.csv"),
+                    index = False
+                )
+
+            else:
+
+                print(f"\n{source}.{name}")
+                print(df.to_string(index = False))
+
+        if memory and hasattr(data, "df_origin"):
+
+            df_memory = memory_report(data)
+
+            print(f"\n{source}.memory: {df_memory['Байт'].sum() / 2 ** 20:.1f} MiB")
+            print(df_memory.to_string(index = False))
+
+
+
+
+def main(argv: "list | None" = None):
+
+    args = build_parser().parse_args(argv)
+
+    if args.profile:
+
+        profiler = cProfile.Profile()
+
+        results = profiler.runcall(compute, args)
+
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.profile)
+
+    else:
+
+        results = compute(args)
+
+    report(results, args.output, args.memory)
+
+    for path in args.metrics:
+        instrumentation.write(path)
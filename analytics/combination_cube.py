@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+
+
+
+class CombinationCube():
+
+    def __init__(
+            self,
+            class_codes: np.ndarray,
+            ability_codes: np.ndarray,
+            class_dtype: pd.CategoricalDtype,
+            ability_dtype: pd.CategoricalDtype
+    ) -> None:
+
+        self.class_dtype = class_dtype
+        self.ability_dtype = ability_dtype
+
+        n_classes = len(class_dtype.categories)
+        n_abilities = len(ability_dtype.categories)
+
+        class_codes = np.where(class_codes < 0, n_classes, class_codes).astype(np.int64)
+        ability_codes = np.where(ability_codes < 0, n_abilities, ability_codes).astype(np.int64)
+
+        full = np.bincount(
+            class_codes * (n_abilities + 1) + ability_codes,
+            minlength = (n_classes + 1) * (n_abilities + 1)
+        ).reshape(n_classes + 1, n_abilities + 1)
+
+        self.counts = full[:n_classes, :n_abilities]
+
+        self.class_totals = full[:n_classes].sum(axis = 1)
+        self.ability_totals = full[:, :n_abilities].sum(axis = 0)
+
+        self.class_unique_abilities = np.count_nonzero(self.counts, axis = 1)
+        self.ability_unique_classes = np.count_nonzero(self.counts, axis = 0)
+
+
+
+
+    def combination_frame(self) -> pd.DataFrame:
+
+        classes, abilities = self.counts.nonzero()
+        values = self.counts[classes, abilities]
+
+        order = np.lexsort((abilities, classes, -values))
+
+        return pd.DataFrame(
+            {
+                "Подкласс": pd.Categorical.from_codes(
+                    classes[order],
+                    dtype = self.class_dtype
+                ),
+                "Умение": pd.Categorical.from_codes(
+                    abilities[order],
+                    dtype = self.ability_dtype
+                ),
+                "Количество игроков": values[order]
+            }
+        )
+
+
+
+
+    def marginal_frame(
+            self,
+            totals: np.ndarray,
+            uniques: np.ndarray,
+            column: str,
+            unique_column: str,
+            dtype: pd.CategoricalDtype,
+            nunique_players: int
+    ) -> pd.DataFrame:
+
+        codes = np.flatnonzero(totals > 0)
+
+        order = np.lexsort((codes, -totals[codes]))
+        codes = codes[order]
+
+        df = pd.DataFrame(
+            {
+                column: pd.Categorical.from_codes(
+                    codes,
+                    dtype = dtype
+                ),
+                "Количество игроков": totals[codes],
+                unique_column: uniques[codes]
+            }
+        )
+
+        df["% игроков"] = df["Количество игроков"]\
+        .div(nunique_players)\
+        .mul(100)\
+        .round(2)
+
+        return df
+
+
+
+
+    def class_frame(self, nunique_players: int) -> pd.DataFrame:
+
+        return self.marginal_frame(
+            self.class_totals,
+            self.class_unique_abilities,
+            "Подкласс",
+            "Уникальных умений",
+            self.class_dtype,
+            nunique_players
+        )
+
+
+
+
+    def ability_frame(self, nunique_players: int) -> pd.DataFrame:
+
+        return self.marginal_frame(
+            self.ability_totals,
+            self.ability_unique_classes,
+            "Умение",
+            "Уникальных подклассов",
+            self.ability_dtype,
+            nunique_players
+        )
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+from time import time
+
+import requests
+
+from analytics.instrumentation import stage
+
+
+CACHE_DIR = os.environ.get("CHUDES_CACHE_DIR", ".cache")
+
+
+
+
+class CachedDownload():
+
+    def __init__(self, url: str, name: str, cache_dir: str = CACHE_DIR, timeout: float = 60) -> None:
+
+        self.url = url
+        self.timeout = timeout
+
+        self.path = os.path.join(cache_dir, name)
+        self.meta_path = f"{self.path}.json"
+
+        os.makedirs(
+            cache_dir,
+            exist_ok = True
+        )
+
+        self.meta = self.read_meta()
+        self.changed = True
+
+
+
+
+    def read_meta(self) -> dict:
+
+        if not (os.path.exists(self.meta_path) and os.path.exists(self.path)):
+            return {}
+
+        with open(self.meta_path, encoding = "utf-8") as file:
+            return json.load(file)
+
+
+
+
+    def write_meta(self):
+
+        tmp_path = f"{self.meta_path}.tmp"
+
+        with open(tmp_path, "w", encoding = "utf-8") as file:
+            json.dump(self.meta, file)
+
+        os.replace(tmp_path, self.meta_path)
+
+
+
+
+    def conditional_headers(self) -> dict:
+
+        headers = {}
+
+        if self.meta.get("etag"):
+            headers["If-None-Match"] = self.meta["etag"]
+
+        if self.meta.get("last_modified"):
+            headers["If-Modified-Since"] = self.meta["last_modified"]
+
+        return headers
+
+
+
+
+    def fetch(self) -> "CachedDownload":
+
+        with stage(f"download.{os.path.basename(self.path)}") as record:
+
+            self.request(record)
+
+            record.hit = not self.changed
+
+        return self
+
+
+
+
+    def request(self, record):
+
+        response = requests.get(
+            self.url,
+            headers = self.conditional_headers(),
+            timeout = self.timeout
+        )
+
+        if response.status_code == 304 and self.meta:
+
+            self.changed = False
+            self.meta["checked_at"] = time()
+            self.write_meta()
+
+            return
+
+        response.raise_for_status()
+
+        record.bytes = len(response.content)
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+
+        self.changed = content_hash != self.meta.get("sha256")
+
+        if self.changed:
+
+            tmp_path = f"{self.path}.tmp"
+
+            with open(tmp_path, "wb") as file:
+                file.write(response.content)
+
+            os.replace(tmp_path, self.path)
+
+        self.meta = {
+            "url": self.url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": content_hash,
+            "size": len(response.content),
+            "fetched_at": time(),
+            "checked_at": time()
+        }
+        self.write_meta()
+
+
+
+
+    @property
+    def content_hash(self) -> str:
+
+        return self.meta["sha256"]
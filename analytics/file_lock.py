@@ -0,0 +1,103 @@
+import os
+from time import sleep, time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+LOCK_TIMEOUT = 60 * 15
+
+LOCK_POLL_INTERVAL = 0.5
+
+
+
+
+class FileLock():
+
+    def __init__(self, path: str, timeout: float = LOCK_TIMEOUT, poll_interval: float = LOCK_POLL_INTERVAL) -> None:
+
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+        self.file = None
+
+
+
+
+    def try_lock(self) -> bool:
+
+        try:
+
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+            else:
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_NBLCK, 1)
+
+        except OSError:
+
+            return False
+
+        return True
+
+
+
+
+    def acquire(self):
+
+        os.makedirs(
+            os.path.dirname(os.path.abspath(self.path)),
+            exist_ok = True
+        )
+
+        self.file = open(self.path, "a+")
+        started_at = time()
+
+        while not self.try_lock():
+
+            if time() - started_at > self.timeout:
+
+                self.file.close()
+                self.file = None
+
+                raise TimeoutError(
+                    f"could not lock {self.path} in {self.timeout}s"
+                )
+
+            sleep(self.poll_interval)
+
+
+
+
+    def release(self):
+
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+
+        self.file.close()
+        self.file = None
+
+
+
+
+    def __enter__(self) -> "FileLock":
+
+        self.acquire()
+
+        return self
+
+
+
+
+    def __exit__(self, *exc_info):
+
+        self.release()
@@ -0,0 +1,413 @@
+import hashlib
+from time import time
+
+import numpy as np
+import pandas as pd
+from numpy import nan
+
+from analytics.aggregation import GoogleDocAggregates
+from analytics.download_cache import CachedDownload
+from analytics.instrumentation import stage, timed
+from analytics.lazy_tables import LazyTables
+from analytics.player_search import NameIndex
+from analytics.reference import ReferenceData
+from analytics.sheet_loaders import SHEET_ENGINE, choose_loader
+
+
+
+
+class GoogleDoc(LazyTables):
+    link = "https://docs.google.com/spreadsheets/d/1XiP5ss6ijjE5iiBC09C7lUW0ngV3QJt0hGRa_Zwufy8/export#gid=690744568#gid=690744568&format=xlsx"
+
+    csv_link = "https://docs.google.com/spreadsheets/d/1XiP5ss6ijjE5iiBC09C7lUW0ngV3QJt0hGRa_Zwufy8/export?format=csv&gid=690744568"
+
+    links = {
+        "xlsx": link,
+        "csv": csv_link
+    }
+
+    sheet_name = "Участники"
+
+    reward_threshold = 10
+
+    main_columns = [
+        "Логин",
+        "Подкласс",
+        "Умение",
+        "Был реролл",
+        "Пожиратель",
+        "Экзарх",
+        "Древний",
+        "Создатель",
+        "Кора",
+        "Ол",
+        "Ошаби",
+        "Убер Древний",
+        "Олрот",
+        "Убер Атзири",
+        "Сирус",
+        "Мейвен",
+        "Убийцы Древнего",
+        "Сокрытые",
+        "Убер Пожиратель",
+        "Убер Экзарх",
+        "Убер Убер Древний",
+        "Убер Создатель",
+        "Убер Кора",
+        "Убер Сирус",
+        "Убер Мейвен",
+        "Внушающие страх",
+        "Симулякр 15"
+    ]
+
+    bosses_columns = main_columns[4:]
+
+    reroll_map = {
+        nan: "Без реролла",
+        1: "Один реролл",
+        2: "Два реролла"
+    }
+
+    derived = {
+        "aggregates": ("prepare_aggregates", []),
+        "nunique_players": ("find_nunique_players", ["aggregates"]),
+        "is_login_duplicated": ("find_duplicated_flag", ["aggregates"]),
+        "total_coins_for_bosses": ("find_total_coins_for_bosses", ["aggregates"]),
+        "players_with_reward_for_bosses": ("find_total_players_with_coins_for_bosses", ["aggregates"]),
+        "combination_cube": ("prepare_df_combination_frequency", ["aggregates"]),
+        "df_combination_frequency": ("prepare_df_combination_frequency", ["aggregates"]),
+        "df_coins_for_bosses": ("prepare_df_coins_for_bosses", ["aggregates"]),
+        "df_classes_frequency": ("prepare_df_classes_frequency", ["combination_cube", "nunique_players"]),
+        "df_abilities_frequency": ("prepare_df_abilities_frequency", ["combination_cube", "nunique_players"]),
+        "df_reroll_frequency": ("prepare_df_reroll_frequency", ["aggregates", "nunique_players"]),
+        "df_coins_frequency": ("prepare_df_coins_frequency", ["aggregates"]),
+        "login_index": ("prepare_login_index", [])
+    }
+
+
+
+
+    def __init__(
+            self,
+            reference: ReferenceData,
+            previous: "GoogleDoc | None" = None,
+            path: "str | None" = None,
+            engine: str = SHEET_ENGINE
+    ) -> None:
+
+        self.source = "network" if path is None else "file"
+        self.loaded_at = time()
+
+        self.reference = reference
+        self.loader = choose_loader(engine)
+
+        if path is None:
+            self.download_data()
+        else:
+            self.read_file(path)
+
+        if (
+            previous is not None
+            and previous.content_hash == self.content_hash
+            and previous.matches_reference(reference)
+        ):
+
+            self.reuse(previous)
+
+            return
+
+        self.load_data()
+
+
+
+
+    @classmethod
+    def from_snapshot(cls, df_origin: pd.DataFrame, meta: dict) -> "GoogleDoc":
+
+        data_class = cls.__new__(cls)
+
+        data_class.source = "snapshot"
+        data_class.loaded_at = meta["loaded_at"]
+        data_class.content_hash = meta.get("content_hash")
+
+        data_class.df_origin = df_origin
+
+        return data_class
+
+
+
+
+    def snapshot_meta(self) -> dict:
+
+        return {
+            "loaded_at": self.loaded_at,
+            "content_hash": self.content_hash
+        }
+
+
+
+
+    def tables(self) -> dict:
+
+        return {
+            "combination_frequency": self.df_combination_frequency,
+            "coins_for_bosses": self.df_coins_for_bosses,
+            "classes_frequency": self.df_classes_frequency,
+            "abilities_frequency": self.df_abilities_frequency,
+            "reroll_frequency": self.df_reroll_frequency,
+            "coins_frequency": self.df_coins_frequency
+        }
+
+
+
+
+    def metrics(self) -> dict:
+
+        return {
+            "nunique_players": self.nunique_players,
+            "total_coins_for_bosses": self.total_coins_for_bosses,
+            "players_with_reward_for_bosses": self.players_with_reward_for_bosses,
+            "is_login_duplicated": self.is_login_duplicated
+        }
+
+
+
+
+    def prepare_aggregates(self):
+
+        self.aggregates = GoogleDocAggregates(
+            self.df_origin,
+            self.bosses_columns
+        )
+
+
+    @timed
+    def download_data(self):
+
+        download = CachedDownload(
+            self.links[self.loader.format],
+            f"google_doc.{self.loader.format}"
+        ).fetch()
+
+        self.source_path = download.path
+        self.content_hash = download.content_hash
+
+
+
+
+    def read_file(self, path: str):
+
+        with open(path, "rb") as file:
+            self.content_hash = hashlib.sha256(file.read()).hexdigest()
+
+        self.source_path = path
+
+
+
+
+    def matches_reference(self, reference: ReferenceData) -> bool:
+
+        return self.df_origin["Умение"].dtype == reference.ability_dtype\
+        and self.df_origin["Подкласс"].dtype == reference.class_dtype
+
+
+
+
+    def reuse(self, previous: "GoogleDoc"):
+
+        for name, value in vars(previous).items():
+
+            if name not in vars(self) and name not in ("lazy_lock", "compute_seconds"):
+                setattr(self, name, value)
+
+
+
+
+    def load_data(self):
+
+        with stage(f"GoogleDoc.parse.{self.loader.name}") as record:
+
+            self.df_origin = self.loader.read(
+                self.source_path,
+                self.sheet_name,
+                self.main_columns
+            ).dropna(
+                subset = [
+                    "Логин"
+                ]
+            )
+
+            record.rows = len(self.df_origin)
+
+        self.df_origin["Умение"] = self.reference.encode_abilities(
+            self.df_origin["Умение"]
+        )
+
+        self.df_origin["Подкласс"] = self.reference.encode_classes(
+            self.df_origin["Подкласс"]
+        )
+
+        
+        self.df_origin["Был реролл"] = self.df_origin["Был реролл"].map(self.reroll_map)
+        self.df_origin["Был реролл"] = pd.Categorical(
+            self.df_origin["Был реролл"],
+            categories = self.reroll_map.values()
+        )
+
+
+
+
+    def find_duplicated_flag(self):
+
+        self.is_login_duplicated = self.aggregates.nunique_players < self.aggregates.total_rows
+
+
+    
+    def find_nunique_players(self):
+
+        self.nunique_players = self.aggregates.nunique_players
+
+
+
+
+    def prepare_df_combination_frequency(self):
+
+        self.combination_cube = self.aggregates.cube
+
+        self.df_combination_frequency = self.combination_cube.combination_frame()
+
+
+
+    
+    def prepare_df_coins_for_bosses(self):
+
+        self.df_coins_for_bosses = pd.DataFrame(
+            {
+                "index": self.bosses_columns,
+                "sum": self.aggregates.boss_sums,
+                "count": self.aggregates.boss_counts.astype(float)
+            }
+        ).rename(
+            columns = {
+                "sum": "Сумма монет",
+                "count": "Количество убийств",
+                "index": "Имя босса"
+            }
+        ).sort_values(
+            [
+                "Сумма монет",
+                "Имя босса"
+            ],
+            ascending = [
+                False,
+                True
+            ]
+        )
+
+
+
+    def prepare_df_classes_frequency(self):
+
+        self.df_classes_frequency = self.combination_cube.class_frame(
+            self.nunique_players
+        )
+
+
+
+
+    def prepare_df_abilities_frequency(self):
+
+        self.df_abilities_frequency = self.combination_cube.ability_frame(
+            self.nunique_players
+        )
+
+
+
+
+    def prepare_df_reroll_frequency(self):
+
+        ordered_values = {
+            "Без реролла": 0,
+            "Один реролл": 1,
+            "Два реролла": 2
+        }
+
+        self.df_reroll_frequency = pd.Series(
+            self.aggregates.reroll_counts,
+            index = pd.CategoricalIndex(
+                self.aggregates.reroll_dtype.categories,
+                dtype = self.aggregates.reroll_dtype,
+                name = "Был реролл"
+            ),
+            name = "count"
+        ).sort_values(
+            ascending = False
+        ).to_frame()\
+        .reset_index()\
+        .rename(
+            columns = {
+                "count": "Количество игроков",
+                "Был реролл": "Количество рероллов"
+            }
+        ).sort_values(
+            [
+                "Количество рероллов"
+            ],
+            key = lambda x: x.map(ordered_values)
+        )
+
+        self.df_reroll_frequency["% игроков"] = self.df_reroll_frequency["Количество игроков"]\
+        .div(self.nunique_players)\
+        .mul(100)\
+        .round(2)
+    
+
+
+
+    def find_total_coins_for_bosses(self):
+
+        self.total_coins_for_bosses = self.aggregates.boss_sums.sum().astype(int)
+
+
+
+    
+    def find_total_players_with_coins_for_bosses(self):
+
+        self.players_with_reward_for_bosses = self.aggregates.count_players_with_coins(
+            self.reward_threshold
+        )
+        
+
+
+
+    def prepare_df_coins_frequency(self):
+
+        coins, counts = np.unique(
+            self.aggregates.sorted_coin_totals,
+            return_counts = True
+        )
+
+        self.df_coins_frequency = pd.DataFrame(
+            {
+                "Сумма монет": coins[::-1],
+                "Количество игроков": counts[::-1]
+            }
+        )
+
+
+
+
+    def prepare_login_index(self):
+
+        self.login_index = NameIndex(
+            self.df_origin["Логин"]
+        )
+
+
+
+
+    def player_rows(self, login: str) -> pd.DataFrame:
+
+        return self.df_origin.iloc[
+            self.login_index.account_rows(login)
+        ]
@@ -0,0 +1,298 @@
+import json
+import logging
+import os
+from contextlib import contextmanager
+from functools import wraps
+from threading import Event, Lock, Thread
+from time import perf_counter, time
+
+
+METRICS_INTERVAL = 15
+
+METRICS_PREFIX = "chudes"
+
+
+
+
+class StageStats():
+
+    def __init__(self) -> None:
+
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.last_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.updated_at = None
+
+
+
+
+    def to_dict(self) -> dict:
+
+        return dict(vars(self))
+
+
+
+
+
+
+
+
+class StageRecord():
+
+    def __init__(self) -> None:
+
+        self.rows = 0
+        self.bytes = 0
+        self.hit = None
+
+
+
+
+
+
+
+
+class Instrumentation():
+
+    def __init__(self) -> None:
+
+        self.stages = {}
+        self.started_at = time()
+
+        self.lock = Lock()
+
+
+
+
+    def get(self, name: str) -> StageStats:
+
+        if name not in self.stages:
+            self.stages[name] = StageStats()
+
+        return self.stages[name]
+
+
+
+
+    def record(
+            self,
+            name: str,
+            seconds: "float | None" = None,
+            rows: int = 0,
+            size: int = 0,
+            hit: "bool | None" = None,
+            error: bool = False
+    ):
+
+        with self.lock:
+
+            stats = self.get(name)
+
+            if seconds is not None:
+
+                stats.calls += 1
+                stats.seconds += seconds
+                stats.last_seconds = seconds
+                stats.max_seconds = max(stats.max_seconds, seconds)
+
+            stats.errors += error
+            stats.rows += rows
+            stats.bytes += size
+
+            if hit is not None:
+
+                stats.hits += hit
+                stats.misses += not hit
+
+            stats.updated_at = time()
+
+
+
+
+    @contextmanager
+    def stage(self, name: str):
+
+        record = StageRecord()
+        started_at = perf_counter()
+        error = False
+
+        try:
+
+            yield record
+
+        except BaseException:
+
+            error = True
+
+            raise
+
+        finally:
+
+            self.record(
+                name,
+                perf_counter() - started_at,
+                record.rows,
+                record.bytes,
+                record.hit,
+                error
+            )
+
+
+
+
+    def snapshot(self) -> dict:
+
+        with self.lock:
+
+            return {
+                name: stats.to_dict()
+                for name, stats in sorted(self.stages.items())
+            }
+
+
+
+
+    def to_json(self) -> str:
+
+        return json.dumps(
+            {
+                "started_at": self.started_at,
+                "written_at": time(),
+                "stages": self.snapshot()
+            },
+            indent = 2,
+            ensure_ascii = False
+        )
+
+
+
+
+    def to_prometheus(self) -> str:
+
+        series = {
+            "stage_calls_total": ("counter", "calls"),
+            "stage_errors_total": ("counter", "errors"),
+            "stage_seconds_total": ("counter", "seconds"),
+            "stage_last_seconds": ("gauge", "last_seconds"),
+            "stage_max_seconds": ("gauge", "max_seconds"),
+            "stage_rows_total": ("counter", "rows"),
+            "stage_bytes_total": ("counter", "bytes"),
+            "cache_hits_total": ("counter", "hits"),
+            "cache_misses_total": ("counter", "misses")
+        }
+
+        stages = self.snapshot()
+        lines = []
+
+        for metric, (kind, field) in series.items():
+
+            lines.append(f"# TYPE {METRICS_PREFIX}_{metric} {kind}")
+
+            for name, stats in stages.items():
+
+                label = name.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+                lines.append(
+                    f"{METRICS_PREFIX}_{metric}{{stage=\"{label}\"}} {stats[field]}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+
+
+    def write(self, path: str):
+
+        content = self.to_json() if path.endswith(".json") else self.to_prometheus()
+
+        os.makedirs(
+            os.path.dirname(os.path.abspath(path)),
+            exist_ok = True
+        )
+
+        tmp_path = f"{path}.tmp"
+
+        with open(tmp_path, "w", encoding = "utf-8") as file:
+            file.write(content)
+
+        os.replace(tmp_path, path)
+
+
+
+
+
+
+
+
+class MetricsExporter():
+
+    def __init__(self, paths: list, interval: float = METRICS_INTERVAL) -> None:
+
+        self.paths = paths
+        self.interval = interval
+
+        self.stopped = Event()
+
+        self.thread = Thread(
+            target = self.run,
+            daemon = True
+        )
+
+
+
+
+    def start(self) -> "MetricsExporter":
+
+        self.thread.start()
+
+        return self
+
+
+
+
+    def run(self):
+
+        while not self.stopped.wait(self.interval):
+
+            for path in self.paths:
+
+                try:
+
+                    instrumentation.write(path)
+
+                except OSError as e:
+
+                    logging.error(
+                        e
+                    )
+
+
+
+
+instrumentation = Instrumentation()
+
+
+
+
+def stage(name: str):
+
+    return instrumentation.stage(name)
+
+
+
+
+def timed(function):
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+
+        with instrumentation.stage(function.__qualname__):
+            return function(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,570 @@
+import logging
+from time import time
+from urllib.parse import quote
+
+import pandas as pd
+
+from analytics.ladder_checkpoint import LADDER_CHECKPOINT_PAGES, LadderCheckpoint
+from analytics.ladder_columns import LADDER_COLUMNS, LadderColumns, select_columns
+from analytics.instrumentation import timed
+from analytics.ladder_fetcher import LADDER_PAGE_SIZE, LadderFetcher
+from analytics.lazy_tables import LazyTables
+from analytics.player_search import NameIndex
+
+
+
+
+class Ladder(LazyTables):
+
+    league_id = "PoE Chudes SoK by Cardiff (PL49476)"
+
+    ladder_link = "https://ru.pathofexile.com/ladders/league/{}"
+
+    columns = LADDER_COLUMNS
+
+    compared_columns = [
+        "character_id",
+        "rank",
+        "is_dead",
+        "character_level",
+        "character_class",
+        "solo_depth",
+        "challenges"
+    ]
+
+    full_sync_every = 6
+
+    is_partial = False
+
+    expected_total = None
+
+    derived = {
+        "total_characters": ("prepare_main_metrics", []),
+        "nunique_players": ("prepare_main_metrics", []),
+        "max_depth_solo": ("prepare_main_metrics", []),
+        "df_classes_frequency": ("prepare_df_classes_frequency", []),
+        "df_level_frequency": ("prepare_df_level_frequency", []),
+        "df_challenges_frequency": ("prepare_df_challenges_frequency", []),
+        "df_character_per_account": ("prepare_df_character_per_account", []),
+        "account_index": ("prepare_search_indexes", []),
+        "character_index": ("prepare_search_indexes", [])
+    }
+
+
+    def __init__(
+            self,
+            previous: "Ladder | None" = None,
+            league_id: "str | None" = None,
+            fetcher_options: "dict | None" = None,
+            drop_columns: "list | None" = None,
+            checkpoint_dir: "str | None" = None
+    ) -> None:
+
+        if league_id is not None:
+            self.league_id = league_id
+
+        self.fetcher_options = fetcher_options or {}
+        self.checkpoint_dir = checkpoint_dir
+
+        if drop_columns:
+            self.columns = select_columns(
+                [column for column in LADDER_COLUMNS if column not in drop_columns]
+            )
+
+        self.source = "network"
+        self.loaded_at = time()
+        
+        if previous is None or previous.is_partial or previous.syncs_since_full + 1 >= self.full_sync_every:
+            self.load_data()
+        else:
+            self.sync_data(previous)
+
+
+
+
+    @classmethod
+    def from_snapshot(cls, df_origin: pd.DataFrame, meta: dict) -> "Ladder":
+
+        data_class = cls.__new__(cls)
+
+        data_class.source = "snapshot"
+        data_class.loaded_at = meta["loaded_at"]
+        data_class.league_id = meta.get("league_id", cls.league_id)
+        data_class.is_partial = meta.get("is_partial", False)
+        data_class.expected_total = meta.get("expected_total")
+        data_class.fetcher_options = {}
+
+        data_class.df_origin = LadderColumns.conform(df_origin)
+        data_class.columns = list(data_class.df_origin.columns)
+        data_class.verified_rows = meta.get("verified_rows", len(data_class.df_origin))
+
+        data_class.sync_mode = "snapshot"
+        data_class.syncs_since_full = meta["syncs_since_full"]
+        data_class.pages_fetched = 0
+        data_class.pages_per_second = 0.0
+
+        return data_class
+
+
+
+
+    @property
+    def url(self) -> str:
+
+        return self.ladder_link.format(
+            quote(self.league_id, safe = "()")
+        )
+
+
+
+
+    def snapshot_meta(self) -> dict:
+
+        return {
+            "loaded_at": self.loaded_at,
+            "league_id": self.league_id,
+            "is_partial": self.is_partial,
+            "expected_total": self.expected_total,
+            "syncs_since_full": self.syncs_since_full,
+            "verified_rows": self.verified_rows
+        }
+
+
+
+
+    def tables(self) -> dict:
+
+        return {
+            "classes_frequency": self.df_classes_frequency,
+            "level_frequency": self.df_level_frequency,
+            "challenges_frequency": self.df_challenges_frequency,
+            "character_per_account": self.df_character_per_account
+        }
+
+
+
+
+    def metrics(self) -> dict:
+
+        return {
+            "total_characters": self.total_characters,
+            "nunique_players": self.nunique_players,
+            "max_depth_solo": self.max_depth_solo
+        }
+
+
+
+
+    def make_frame(self, entries: list) -> pd.DataFrame:
+
+        return LadderColumns.from_page(entries, self.columns).to_frame()
+
+
+
+
+    def make_checkpoint(self) -> LadderCheckpoint:
+
+        if self.checkpoint_dir is None:
+            return LadderCheckpoint(self.league_id)
+
+        return LadderCheckpoint(self.league_id, self.checkpoint_dir)
+
+
+
+
+    @timed
+    def load_data(self):
+
+        checkpoint = self.make_checkpoint()
+
+        df_resumed = checkpoint.load(self.columns)
+
+        fetcher = LadderFetcher(self.league_id, **self.fetcher_options)
+
+        columns = LadderColumns(columns = self.columns)
+
+        next_offset = checkpoint.next_offset
+        flushed = 0
+
+        try:
+
+            for offset, entries in fetcher.fetch_pages(checkpoint.next_offset):
+
+                if fetcher.total:
+                    columns.reserve(fetcher.total - checkpoint.next_offset)
+
+                columns.append_page(entries)
+
+                next_offset = offset + len(entries)
+
+                if fetcher.pages_fetched % LADDER_CHECKPOINT_PAGES == 0:
+
+                    checkpoint.save(columns.to_frame().iloc[flushed:], next_offset, fetcher.total)
+                    flushed = columns.size
+
+        except Exception as e:
+
+            if df_resumed is None and columns.size == 0:
+                raise
+
+            logging.error(
+                e
+            )
+
+            checkpoint.save(columns.to_frame().iloc[flushed:], next_offset, fetcher.total)
+
+            self.is_partial = True
+
+        else:
+
+            checkpoint.clear()
+
+        self.expected_total = fetcher.total or checkpoint.total
+
+        if df_resumed is None:
+
+            self.df_origin = columns.to_frame()
+
+        else:
+
+            self.df_origin = LadderColumns.conform(
+                pd.concat(
+                    [
+                        df_resumed,
+                        columns.to_frame()
+                    ],
+                    ignore_index = True
+                ).drop_duplicates(
+                    subset = [
+                        "character_id"
+                    ],
+                    keep = "first"
+                ).reset_index(
+                    drop = True
+                ),
+                self.columns
+            )
+
+        self.verified_rows = len(self.df_origin)
+
+        self.sync_mode = "partial" if self.is_partial else "full"
+        self.syncs_since_full = 0
+        self.pages_fetched = fetcher.pages_fetched
+        self.pages_per_second = fetcher.pages_per_second
+
+
+
+
+    @timed
+    def sync_data(self, previous: "Ladder"):
+
+        snapshot = previous.df_origin
+
+        pages = {}
+
+        with LadderFetcher(self.league_id, **self.fetcher_options) as fetcher:
+
+            for offset, entries in fetcher.iter_from(0):
+
+                pages[offset] = self.make_frame(entries)
+
+                if offset and not fetcher.draining and self.is_page_stable(snapshot, offset, pages[offset]):
+                    fetcher.drain()
+
+            last_offset = max(pages)
+            reached_end = len(pages[last_offset]) < LADDER_PAGE_SIZE
+
+            if not reached_end and fetcher.total and fetcher.total != len(snapshot):
+
+                tail_start = min(fetcher.total, len(snapshot)) // LADDER_PAGE_SIZE * LADDER_PAGE_SIZE
+
+                tail_offsets = [
+                    offset
+                    for offset in range(tail_start, fetcher.total, LADDER_PAGE_SIZE)
+                    if offset not in pages
+                ]
+
+                for offset, entries in fetcher.iter_offsets(tail_offsets):
+
+                    pages[offset] = self.make_frame(entries)
+
+        self.df_origin = self.merge_pages(snapshot, pages)
+        self.verified_rows = self.count_verified_rows(pages)
+
+        self.sync_mode = "incremental"
+        self.syncs_since_full = previous.syncs_since_full + 1
+        self.pages_fetched = fetcher.pages_fetched
+        self.pages_per_second = fetcher.pages_per_second
+
+
+
+
+    def count_verified_rows(self, pages: dict) -> int:
+
+        verified_rows = 0
+
+        while verified_rows in pages:
+
+            page = pages[verified_rows]
+
+            if len(page) < LADDER_PAGE_SIZE:
+                return len(self.df_origin)
+
+            verified_rows += len(page)
+
+        return min(verified_rows, len(self.df_origin))
+
+
+
+
+    @property
+    def is_approximate(self) -> bool:
+
+        return self.verified_rows < len(self.df_origin)
+
+
+
+
+    def is_page_stable(self, snapshot: pd.DataFrame, offset: int, page: pd.DataFrame) -> bool:
+
+        previous_page = snapshot.iloc[offset:offset + len(page)]
+
+        if len(page) == 0 or len(previous_page) != len(page):
+            return False
+
+        if len(page) < LADDER_PAGE_SIZE and offset + len(page) != len(snapshot):
+            return False
+
+        for column in self.compared_columns:
+
+            old = previous_page[column].to_numpy(dtype = object, na_value = None)
+            new = page[column].to_numpy(dtype = object, na_value = None)
+
+            if not (old == new).all():
+                return False
+
+        return True
+
+
+
+
+    def merge_pages(self, snapshot: pd.DataFrame, pages: dict) -> pd.DataFrame:
+
+        df_indexed = snapshot.set_index(
+            "character_id",
+            drop = False
+        )
+
+        last_offset = max(pages)
+
+        superseded = []
+
+        for offset, page in pages.items():
+
+            stop = offset + len(page)
+
+            if offset == last_offset and len(page) < LADDER_PAGE_SIZE:
+                stop = max(stop, len(snapshot))
+
+            superseded.append(
+                snapshot["character_id"].iloc[offset:stop]
+            )
+
+        df_updates = pd.concat(
+            pages.values(),
+            ignore_index = True
+        ).drop_duplicates(
+            subset = [
+                "character_id"
+            ],
+            keep = "first"
+        ).set_index(
+            "character_id",
+            drop = False
+        )
+
+        dropped = pd.Index(
+            pd.concat(superseded)
+        ).union(
+            df_updates.index
+        )
+
+        df_merged = pd.concat(
+            [
+                df_indexed.drop(
+                    dropped,
+                    errors = "ignore"
+                ),
+                df_updates
+            ]
+        ).sort_values(
+            [
+                "rank"
+            ],
+            kind = "stable"
+        ).reset_index(
+            drop = True
+        )[self.columns]
+
+        for column in LadderColumns.dictionary_columns:
+            df_merged[column] = df_merged[column].astype("category")
+
+        return df_merged
+
+
+
+
+    def prepare_main_metrics(self):
+
+        self.total_characters = self.df_origin.shape[0]
+
+        self.nunique_players = self.df_origin["account"].nunique()
+
+        depth = self.df_origin["solo_depth"].max()
+
+        self.max_depth_solo = 0 if pd.isna(depth) else int(depth)
+
+
+
+
+    def prepare_df_classes_frequency(self):
+
+        self.df_classes_frequency = self.df_origin.groupby(
+            [
+                "character_class"
+            ],
+            as_index = False
+        ).agg(
+            **{
+                "Количество персонажей": (
+                    "character_class", "count"
+                ),
+
+                "Минимальный уровень": (
+                    "character_level", "min"
+                ),
+
+                "Средний уровень": (
+                    "character_level", "mean"
+                ),
+
+                "Максимальный уровень": (
+                    "character_level", "max"
+                )
+            }
+        ).sort_values(
+            [
+                "Количество персонажей"
+            ],
+            ascending = False
+        ).rename(
+            columns = {
+                "character_class": "Подкласс"
+            }
+        )
+
+        self.df_classes_frequency["Средний уровень"] = self.df_classes_frequency["Средний уровень"].round(1)
+        
+    
+
+
+    def prepare_df_challenges_frequency(self):
+
+        self.df_challenges_frequency = self.df_origin["challenges"]\
+        .value_counts()\
+        .to_frame()\
+        .reset_index()\
+        .rename(
+            columns = {
+                "challenges": "Количество испытаний",
+                "count": "Количество игроков"
+            }
+        ).sort_values(
+            [
+                "Количество испытаний"
+            ],
+            ascending = False
+        )
+
+
+
+    
+    def prepare_df_level_frequency(self):
+
+        self.df_level_frequency = self.df_origin["character_level"]\
+        .value_counts()\
+        .to_frame()\
+        .reset_index()\
+        .rename(
+            columns = {
+                "character_level": "Уровень персонажа",
+                "count": "Количество персонажей"
+            }
+        ).sort_values(
+            [
+                "Уровень персонажа",
+            ],
+            ascending = False
+        )
+
+
+
+
+    def prepare_df_character_per_account(self):
+
+        self.df_character_per_account = self.df_origin["account"]\
+        .value_counts()\
+        .value_counts()\
+        .to_frame()\
+        .rename(
+            columns = {
+                "count": "Количество игроков"
+            }
+        ).reset_index()\
+        .rename(
+            columns = {
+                "count": "Количество персонажей на аккаунт"
+            }
+        ).sort_values(
+            [
+                "Количество персонажей на аккаунт"
+            ]
+        )
+
+
+
+
+    def prepare_search_indexes(self):
+
+        self.account_index = NameIndex(
+            self.df_origin["account"]
+        )
+
+        self.character_index = NameIndex(
+            self.df_origin["character_name"]
+            if "character_name" in self.df_origin
+            else pd.Series([], dtype = object)
+        )
+
+
+
+
+    def account_characters(self, account: str) -> pd.DataFrame:
+
+        return self.df_origin.iloc[
+            self.account_index.account_rows(account)
+        ]
+
+
+
+
+    def character_account(self, character_name: str) -> "str | None":
+
+        key_id = self.character_index.find(character_name)
+
+        if key_id is None:
+            return None
+
+        return self.df_origin["account"].iloc[
+            self.character_index.rows(key_id)[0]
+        ]
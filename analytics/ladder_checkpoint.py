@@ -0,0 +1,114 @@
+import os
+from time import time
+from urllib.parse import quote
+
+import pandas as pd
+
+from analytics.download_cache import CACHE_DIR
+from analytics.ladder_columns import LadderColumns
+from analytics.snapshot_store import SnapshotStore
+
+
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "ladder_checkpoints")
+
+LADDER_CHECKPOINT_PAGES = 25
+
+LADDER_CHECKPOINT_TTL = 60 * 30
+
+
+
+
+class LadderCheckpoint():
+
+    def __init__(self, league_id: str, directory: str = CHECKPOINT_DIR, ttl: float = LADDER_CHECKPOINT_TTL) -> None:
+
+        self.store = SnapshotStore(
+            os.path.join(directory, quote(league_id, safe = ""))
+        )
+        self.ttl = ttl
+
+        self.started_at = time()
+        self.next_offset = 0
+        self.total = None
+
+
+
+
+    def chunk_names(self) -> list:
+
+        return sorted(
+            name.removesuffix(".arrow")
+            for name in os.listdir(self.store.directory)
+            if name.endswith(".arrow")
+        )
+
+
+
+
+    def load(self, columns: "list | None" = None) -> "pd.DataFrame | None":
+
+        chunks = [
+            self.store.load(name)
+            for name in self.chunk_names()
+        ]
+
+        if not chunks:
+            return None
+
+        frames, metas = zip(*chunks)
+
+        if time() - metas[0]["started_at"] > self.ttl:
+
+            self.clear()
+
+            return None
+
+        self.started_at = metas[0]["started_at"]
+        self.next_offset = metas[-1]["next_offset"]
+        self.total = metas[-1]["total"]
+
+        return LadderColumns.conform(
+            pd.concat(
+                frames,
+                ignore_index = True
+            ),
+            columns
+        )
+
+
+
+
+    def save(self, df_chunk: pd.DataFrame, next_offset: int, total: "int | None"):
+
+        if df_chunk.empty:
+            return
+
+        self.next_offset = next_offset
+        self.total = total
+
+        for column in LadderColumns.dictionary_columns:
+
+            if column in df_chunk:
+                df_chunk[column] = df_chunk[column].cat.remove_unused_categories()
+
+        self.store.save(
+            f"{next_offset:08d}",
+            df_chunk,
+            {
+                "started_at": self.started_at,
+                "next_offset": next_offset,
+                "total": total
+            }
+        )
+
+
+
+
+    def clear(self):
+
+        for name in self.chunk_names():
+            os.remove(self.store.path(name))
+
+        self.started_at = time()
+        self.next_offset = 0
+        self.total = None
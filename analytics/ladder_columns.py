@@ -0,0 +1,310 @@
+import numpy as np
+import pandas as pd
+
+
+LADDER_COLUMNS = [
+    "rank",
+    "is_dead",
+    "is_public",
+    "account",
+    "character_id",
+    "character_name",
+    "character_level",
+    "character_class",
+    "solo_depth",
+    "challenges"
+]
+
+
+
+
+class DictionaryColumn():
+
+    def __init__(self, capacity: int) -> None:
+
+        self.codes = np.empty(capacity, dtype = np.int32)
+        self.lookup = {}
+        self.categories = []
+
+
+
+
+    def grow(self, capacity: int):
+
+        codes = np.empty(capacity, dtype = np.int32)
+        codes[:len(self.codes)] = self.codes
+
+        self.codes = codes
+
+
+
+
+    def encode(self, value) -> int:
+
+        if value is None:
+            return -1
+
+        code = self.lookup.get(value)
+
+        if code is None:
+
+            code = len(self.categories)
+
+            self.lookup[value] = code
+            self.categories.append(value)
+
+        return code
+
+
+
+
+    def put(self, start: int, values: list):
+
+        self.codes[start:start + len(values)] = [
+            self.encode(value)
+            for value in values
+        ]
+
+
+
+
+    def to_categorical(self, size: int) -> pd.Categorical:
+
+        return pd.Categorical.from_codes(
+            self.codes[:size],
+            categories = self.categories,
+            validate = False
+        )
+
+
+
+
+
+
+
+
+def select_columns(columns: "list | None" = None) -> list:
+
+    if columns is None:
+        return list(LADDER_COLUMNS)
+
+    unknown = set(LADDER_COLUMNS).difference(columns).difference(LadderColumns.optional_columns)
+
+    if unknown:
+        raise ValueError(
+            f"required ladder columns missing: {sorted(unknown)}"
+        )
+
+    return [
+        column
+        for column in LADDER_COLUMNS
+        if column in columns
+    ]
+
+
+
+
+
+
+
+class LadderColumns():
+
+    typed_columns = {
+        "rank": np.int32,
+        "is_dead": np.bool_,
+        "is_public": np.bool_,
+        "character_id": object,
+        "character_name": object,
+        "character_level": np.int16,
+        "solo_depth": np.int32,
+        "challenges": np.int16
+    }
+
+    dictionary_columns = [
+        "account",
+        "character_class"
+    ]
+
+    nullable_columns = {
+        "solo_depth": "Int32"
+    }
+
+    optional_columns = [
+        "is_public",
+        "character_name"
+    ]
+
+    extractors = {
+        "rank": lambda entries, characters, accounts: [record.get("rank") for record in entries],
+        "is_dead": lambda entries, characters, accounts: [bool(record.get("dead")) for record in entries],
+        "is_public": lambda entries, characters, accounts: [bool(record.get("public")) for record in entries],
+        "character_id": lambda entries, characters, accounts: [character.get("id") for character in characters],
+        "character_name": lambda entries, characters, accounts: [character.get("name") for character in characters],
+        "character_level": lambda entries, characters, accounts: [character.get("level") for character in characters],
+        "solo_depth": lambda entries, characters, accounts: [
+            character["depth"].get("solo") if "depth" in character else None
+            for character in characters
+        ],
+        "challenges": lambda entries, characters, accounts: [account.get("challenges").get("completed") for account in accounts],
+        "account": lambda entries, characters, accounts: [account.get("name") for account in accounts],
+        "character_class": lambda entries, characters, accounts: [character.get("class") for character in characters]
+    }
+
+
+    def __init__(self, capacity: int = 256, columns: "list | None" = None) -> None:
+
+        self.size = 0
+        self.capacity = capacity
+
+        self.columns = select_columns(columns)
+
+        self.buffers = {
+            column: np.empty(capacity, dtype = dtype)
+            for column, dtype in self.typed_columns.items()
+            if column in self.columns
+        }
+
+        self.masks = {
+            column: np.empty(capacity, dtype = np.bool_)
+            for column in self.nullable_columns
+            if column in self.columns
+        }
+
+        self.dictionaries = {
+            column: DictionaryColumn(capacity)
+            for column in self.dictionary_columns
+        }
+
+
+
+
+    @classmethod
+    def from_page(cls, entries: list, columns: "list | None" = None) -> "LadderColumns":
+
+        page_columns = cls(max(len(entries), 1), columns)
+        page_columns.append_page(entries)
+
+        return page_columns
+
+
+
+
+    @classmethod
+    def schema(cls) -> dict:
+
+        return {
+            **{
+                column: cls.nullable_columns.get(column, "str" if dtype is object else dtype)
+                for column, dtype in cls.typed_columns.items()
+            },
+            **{
+                column: "category"
+                for column in cls.dictionary_columns
+            }
+        }
+
+
+
+
+    @classmethod
+    def conform(cls, df: pd.DataFrame, columns: "list | None" = None) -> pd.DataFrame:
+
+        columns = [
+            column
+            for column in select_columns(columns)
+            if column in df.columns
+        ]
+        schema = cls.schema()
+
+        return df[columns].astype(
+            {
+                column: schema[column]
+                for column in columns
+            }
+        )
+
+
+
+
+    def reserve(self, capacity: int):
+
+        if capacity <= self.capacity:
+            return
+
+        for buffers in (self.buffers, self.masks):
+
+            for column, buffer in buffers.items():
+
+                grown = np.empty(capacity, dtype = buffer.dtype)
+                grown[:self.size] = buffer[:self.size]
+
+                buffers[column] = grown
+
+        for dictionary in self.dictionaries.values():
+            dictionary.grow(capacity)
+
+        self.capacity = capacity
+
+
+
+
+    def append_page(self, entries: list):
+
+        start = self.size
+        stop = start + len(entries)
+
+        if stop > self.capacity:
+            self.reserve(max(stop, self.capacity * 2))
+
+        characters = [record["character"] for record in entries]
+        accounts = [record["account"] for record in entries]
+
+        for column, buffer in self.buffers.items():
+
+            values = self.extractors[column](entries, characters, accounts)
+
+            if column in self.masks:
+
+                mask = [value is None for value in values]
+
+                self.masks[column][start:stop] = mask
+                values = [0 if missing else value for value, missing in zip(values, mask)]
+
+            buffer[start:stop] = values
+
+        for column, dictionary in self.dictionaries.items():
+
+            dictionary.put(
+                start,
+                self.extractors[column](entries, characters, accounts)
+            )
+
+        self.size = stop
+
+
+
+
+    def to_frame(self) -> pd.DataFrame:
+
+        data = {
+            column: buffer[:self.size]
+            for column, buffer in self.buffers.items()
+        }
+
+        for column, mask in self.masks.items():
+
+            data[column] = pd.arrays.IntegerArray(
+                data[column],
+                mask[:self.size].copy()
+            )
+
+        for column, dictionary in self.dictionaries.items():
+            data[column] = dictionary.to_categorical(self.size)
+
+        return pd.DataFrame(
+            {
+                column: data[column]
+                for column in self.columns
+            },
+            copy = False
+        )
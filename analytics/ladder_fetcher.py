@@ -0,0 +1,433 @@
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic, sleep, time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from analytics.instrumentation import instrumentation, stage
+
+
+LADDER_PAGE_SIZE = 200
+
+LADDER_RATE_LIMIT = 1.0
+
+LADDER_BURST = 3
+
+LADDER_MAX_WORKERS = 4
+
+LADDER_TIMEOUT = 30
+
+LADDER_RETRIES = 4
+
+LADDER_BACKOFF = 1.0
+
+LADDER_MAX_BACKOFF = 60
+
+RETRY_STATUSES = {
+    429,
+    500,
+    502,
+    503,
+    504
+}
+
+
+
+
+class TokenBucket():
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = monotonic()
+        self.lock = Lock()
+
+
+
+
+    def refill(self):
+
+        now = monotonic()
+
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+
+
+
+    def acquire(self):
+
+        while True:
+
+            with self.lock:
+
+                self.refill()
+
+                if self.tokens >= 1:
+
+                    self.tokens -= 1
+
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            sleep(wait)
+
+
+
+
+    def pause(self, seconds: float):
+
+        with self.lock:
+
+            self.refill()
+
+            self.tokens = min(
+                self.tokens,
+                -seconds * self.rate
+            )
+
+
+
+
+
+
+
+
+class LadderFetcher():
+
+    link = "https://ru.pathofexile.com/api/ladders"
+
+    headers = {
+        "User-Agent": "Opera"
+    }
+
+
+    def __init__(
+            self,
+            league_id: str,
+            rate_limit: float = LADDER_RATE_LIMIT,
+            burst: int = LADDER_BURST,
+            max_workers: int = LADDER_MAX_WORKERS,
+            timeout: float = LADDER_TIMEOUT,
+            link: "str | None" = None,
+            bucket: "TokenBucket | None" = None,
+            retries: int = LADDER_RETRIES,
+            backoff: float = LADDER_BACKOFF
+    ) -> None:
+
+        self.league_id = league_id
+
+        if link is not None:
+            self.link = link
+
+        self.bucket = bucket or TokenBucket(rate_limit, burst)
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self.total = None
+        self.pages_fetched = 0
+        self.draining = False
+        self.elapsed = 0.0
+        self.pages_per_second = 0.0
+
+
+
+
+    def __enter__(self):
+
+        self.session = self.make_session()
+        self.executor = ThreadPoolExecutor(self.max_workers)
+
+        self.started_at = monotonic()
+        self.pages_fetched = 0
+        self.draining = False
+
+        return self
+
+
+
+
+    def __exit__(self, *exc_info):
+
+        self.executor.shutdown(
+            cancel_futures = True
+        )
+        self.session.close()
+
+        self.report()
+
+
+
+
+    def make_session(self) -> requests.Session:
+
+        session = requests.Session()
+
+        adapter = HTTPAdapter(
+            pool_connections = 1,
+            pool_maxsize = self.max_workers
+        )
+
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.headers)
+
+        return session
+
+
+
+
+    def request_page(self, offset: int) -> dict:
+
+        self.bucket.acquire()
+
+        with stage("LadderFetcher.page") as record:
+
+            response = self.session.get(
+                self.link,
+                params = {
+                    "offset": offset,
+                    "limit": LADDER_PAGE_SIZE,
+                    "id": self.league_id,
+                    "realm": "pc"
+                },
+                timeout = self.timeout
+            )
+            response.raise_for_status()
+
+            page = response.json()
+
+            if not isinstance(page, dict) or not isinstance(page.get("entries"), list):
+                raise ValueError(
+                    f"malformed ladder page at offset {offset}"
+                )
+
+            record.rows = len(page["entries"])
+            record.bytes = len(response.content)
+
+        return page
+
+
+
+
+    def is_retryable(self, error: Exception) -> bool:
+
+        response = getattr(error, "response", None)
+
+        if response is None:
+            return isinstance(error, (requests.RequestException, ValueError))
+
+        return response.status_code in RETRY_STATUSES
+
+
+
+
+    def retry_delay(self, error: Exception, attempt: int) -> float:
+
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+
+        delay = None
+
+        if retry_after:
+
+            try:
+
+                delay = float(retry_after)
+
+            except ValueError:
+
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time()
+
+                except (TypeError, ValueError):
+
+                    logging.warning(
+                        "ladder %s: malformed Retry-After %r",
+                        self.league_id,
+                        retry_after
+                    )
+
+        if delay is None:
+            delay = self.backoff * 2 ** attempt + random.uniform(0, self.backoff)
+
+        return min(max(delay, 0.0), LADDER_MAX_BACKOFF)
+
+
+
+
+    def fetch_page(self, offset: int) -> dict:
+
+        attempt = 0
+
+        while True:
+
+            try:
+
+                return self.request_page(offset)
+
+            except (requests.RequestException, ValueError) as e:
+
+                if attempt >= self.retries or not self.is_retryable(e):
+                    raise
+
+                delay = self.retry_delay(e, attempt)
+                attempt += 1
+
+                instrumentation.record(
+                    "LadderFetcher.retry",
+                    delay
+                )
+
+                logging.warning(
+                    "ladder %s offset %s: %s, retry %s in %.1fs",
+                    self.league_id,
+                    offset,
+                    e,
+                    attempt,
+                    delay
+                )
+
+                if getattr(e, "response", None) is not None and e.response.status_code == 429:
+                    self.bucket.pause(delay)
+                else:
+                    sleep(delay)
+
+
+
+
+    def collect(self, future) -> list:
+
+        page = future.result()
+
+        self.pages_fetched += 1
+
+        if page.get("total"):
+            self.total = page["total"]
+
+        return page["entries"]
+
+
+
+
+    def iter_offsets(self, offsets):
+
+        futures = [
+            (offset, self.executor.submit(self.fetch_page, offset))
+            for offset in offsets
+        ]
+
+        try:
+
+            for offset, future in futures:
+
+                yield offset, self.collect(future)
+
+        finally:
+
+            for _, future in futures:
+                future.cancel()
+
+
+
+
+    def drain(self):
+
+        self.draining = True
+
+
+
+
+    def iter_from(self, offset: int):
+
+        futures = []
+
+        try:
+
+            while True:
+
+                while (
+                    not self.draining
+                    and len(futures) < self.max_workers
+                    and (not self.total or offset < self.total)
+                ):
+
+                    futures.append(
+                        (offset, self.executor.submit(self.fetch_page, offset))
+                    )
+                    offset += LADDER_PAGE_SIZE
+
+                if not futures:
+                    break
+
+                page_offset, future = futures.pop(0)
+
+                if self.draining and future.cancel():
+                    continue
+
+                entries = self.collect(future)
+
+                yield page_offset, entries
+
+                if len(entries) < LADDER_PAGE_SIZE:
+                    break
+
+        finally:
+
+            for _, future in futures:
+                future.cancel()
+
+
+
+
+    def fetch_pages(self, offset: int = 0):
+
+        with self:
+
+            entries = self.collect(
+                self.executor.submit(self.fetch_page, offset)
+            )
+
+            yield offset, entries
+
+            if len(entries) < LADDER_PAGE_SIZE:
+                return
+
+            if self.total:
+
+                yield from self.iter_offsets(
+                    range(offset + LADDER_PAGE_SIZE, self.total, LADDER_PAGE_SIZE)
+                )
+
+            else:
+
+                yield from self.iter_from(offset + LADDER_PAGE_SIZE)
+
+
+
+
+    def report(self):
+
+        self.elapsed = monotonic() - self.started_at
+
+        self.pages_per_second = self.pages_fetched / self.elapsed if self.elapsed else 0.0
+
+        logging.info(
+            "ladder %s: %s pages in %.1fs (%.2f pages/s)",
+            self.league_id,
+            self.pages_fetched,
+            self.elapsed,
+            self.pages_per_second
+        )
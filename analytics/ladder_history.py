@@ -0,0 +1,469 @@
+import os
+from threading import Lock
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+from analytics.download_cache import CACHE_DIR
+from analytics.ladder_columns import LadderColumns
+from analytics.lazy_tables import LazyTables
+from analytics.snapshot_store import SnapshotStore
+
+
+HISTORY_DIR = os.path.join(CACHE_DIR, "history")
+
+TRACKED_COLUMNS = [
+    "rank",
+    "is_dead",
+    "account",
+    "character_name",
+    "character_level",
+    "character_class",
+    "solo_depth",
+    "challenges"
+]
+
+CLASS_TREND_COLUMNS = [
+    "recorded_at",
+    "character_class",
+    "characters",
+    "mean_level",
+    "death_rate"
+]
+
+
+
+
+class HistoryView(LazyTables):
+
+    derived = {
+        "df_level_gain": ("prepare_df_level_gain", []),
+        "df_rank_climb": ("prepare_df_rank_climb", []),
+        "df_class_level_trend": ("prepare_df_class_level_trend", []),
+        "df_class_death_trend": ("prepare_df_class_death_trend", [])
+    }
+
+    top = 20
+
+
+    def __init__(self, state: pd.DataFrame, class_trend: pd.DataFrame, seq: int) -> None:
+
+        self.state = state
+        self.class_trend = class_trend
+        self.seq = seq
+
+        self.refreshes = class_trend["recorded_at"].nunique()
+
+
+
+
+    def tables(self) -> dict:
+
+        return {
+            "level_gain": self.df_level_gain,
+            "rank_climb": self.df_rank_climb,
+            "class_level_trend": self.df_class_level_trend,
+            "class_death_trend": self.df_class_death_trend
+        }
+
+
+
+
+    def movers(self, change: pd.Series, label: str) -> pd.DataFrame:
+
+        alive = ~self.state["removed"]
+
+        df = self.state.loc[alive].assign(
+            **{
+                label: change[alive]
+            }
+        ).nlargest(
+            self.top,
+            label
+        )
+
+        return df[df[label] > 0][
+            [
+                "character_name",
+                "account",
+                "character_class",
+                "character_level",
+                "rank",
+                label
+            ]
+        ].rename(
+            columns = {
+                "character_name": "Персонаж",
+                "account": "Аккаунт",
+                "character_class": "Подкласс",
+                "character_level": "Уровень",
+                "rank": "Место"
+            }
+        )
+
+
+
+
+    def prepare_df_level_gain(self):
+
+        self.df_level_gain = self.movers(
+            self.state["character_level"] - self.state["first_level"],
+            "Уровней за ивент"
+        )
+
+
+
+
+    def prepare_df_rank_climb(self):
+
+        self.df_rank_climb = self.movers(
+            self.state["first_rank"] - self.state["rank"],
+            "Подъём в рейтинге"
+        )
+
+
+
+
+    def trend(self, column: str) -> pd.DataFrame:
+
+        df = self.class_trend.pivot(
+            index = "recorded_at",
+            columns = "character_class",
+            values = column
+        )
+
+        df.index = pd.to_datetime(df.index, unit = "s")
+
+        return df.rename_axis(
+            index = "Время",
+            columns = "Подкласс"
+        )
+
+
+
+
+    def prepare_df_class_level_trend(self):
+
+        self.df_class_level_trend = self.trend("mean_level")
+
+
+
+
+    def prepare_df_class_death_trend(self):
+
+        self.df_class_death_trend = self.trend("death_rate")
+
+
+
+
+
+
+
+
+class LadderHistory():
+
+    def __init__(self, league_id: str, directory: str = HISTORY_DIR) -> None:
+
+        self.league_id = league_id
+        self.directory = os.path.join(directory, quote(league_id, safe = ""))
+
+        self.store = SnapshotStore(self.directory)
+        self.segments = SnapshotStore(
+            os.path.join(self.directory, "segments")
+        )
+
+        self.lock = Lock()
+
+        self.load()
+
+
+
+
+    def segment_names(self) -> list:
+
+        return sorted(
+            name.removesuffix(".arrow")
+            for name in os.listdir(self.segments.directory)
+            if name.endswith(".arrow")
+        )
+
+
+
+
+    def load(self):
+
+        state = self.store.load("state")
+
+        self.seq = 0
+        self.recorded_at = 0.0
+
+        self.state = pd.DataFrame(
+            columns = list(self.schema())
+        ).astype(self.schema()).rename_axis("character_id")
+        self.class_trend = pd.DataFrame(
+            columns = CLASS_TREND_COLUMNS
+        )
+
+        if state is not None:
+
+            df_state, meta = state
+
+            self.state = df_state.set_index("character_id").astype(self.schema())
+            self.seq = meta["seq"]
+            self.recorded_at = meta["recorded_at"]
+
+            class_trend = self.store.load("class_trend")
+
+            if class_trend is not None:
+
+                self.class_trend = class_trend[0][
+                    class_trend[0]["recorded_at"] <= self.recorded_at
+                ].reset_index(
+                    drop = True
+                )
+
+        self.class_stats = self.count_classes(
+            self.state[~self.state["removed"].astype(bool)]
+        )
+
+        if state is not None and not (self.class_trend["recorded_at"] == self.recorded_at).any():
+            self.record_trend(self.recorded_at)
+
+        for name in self.segment_names():
+
+            if int(name) > self.seq:
+
+                delta, meta = self.segments.load(name)
+
+                self.apply(
+                    delta.set_index("character_id"),
+                    meta["recorded_at"]
+                )
+                self.seq = int(name)
+
+        self.view = HistoryView(self.state, self.class_trend, self.seq)
+
+
+
+
+    def reload_if_changed(self):
+
+        names = self.segment_names()
+
+        if names and int(names[-1]) > self.seq:
+            self.load()
+
+
+
+
+    def current_view(self) -> HistoryView:
+
+        with self.lock:
+
+            self.reload_if_changed()
+
+            return self.view
+
+
+
+
+    def diff(self, current: pd.DataFrame) -> pd.DataFrame:
+
+        previous = self.state.loc[~self.state["removed"].astype(bool), TRACKED_COLUMNS]
+
+        common = current.index.intersection(previous.index)
+
+        changed = np.zeros(len(common), dtype = bool)
+
+        for column in TRACKED_COLUMNS:
+
+            old = previous.loc[common, column].to_numpy(dtype = object, na_value = None)
+            new = current.loc[common, column].to_numpy(dtype = object, na_value = None)
+
+            changed |= old != new
+
+        return pd.concat(
+            [
+                current.loc[
+                    current.index.difference(previous.index).union(common[changed])
+                ].assign(removed = False),
+                previous.loc[
+                    previous.index.difference(current.index)
+                ].assign(removed = True)
+            ]
+        )
+
+
+
+
+    def schema(self) -> dict:
+
+        schema = LadderColumns.schema()
+
+        return {
+            **{
+                column: "str" if schema[column] == "category" else schema[column]
+                for column in TRACKED_COLUMNS
+            },
+            "removed": np.bool_,
+            "first_seen_at": np.float64,
+            "first_level": schema["character_level"],
+            "first_rank": schema["rank"],
+            "died_at": np.float64,
+            "updated_at": np.float64
+        }
+
+
+
+
+    def count_classes(self, rows: pd.DataFrame) -> pd.DataFrame:
+
+        return pd.DataFrame(
+            {
+                "characters": 1,
+                "level_sum": rows["character_level"].astype(float),
+                "deaths": rows["is_dead"].astype(float)
+            },
+            index = rows.index
+        ).groupby(
+            rows["character_class"].astype(str)
+        ).sum()
+
+
+
+
+    def apply(self, delta: pd.DataFrame, recorded_at: float):
+
+        old = self.state.reindex(delta.index)
+
+        existed = delta.index.isin(self.state.index)
+        was_alive = existed & ~old["removed"].astype(bool).to_numpy()
+        is_alive = ~delta["removed"].to_numpy()
+
+        self.class_stats = self.class_stats.sub(
+            self.count_classes(old[was_alive]),
+            fill_value = 0
+        ).add(
+            self.count_classes(delta[is_alive]),
+            fill_value = 0
+        )
+
+        died = delta["is_dead"].astype(bool).to_numpy() & ~old["is_dead"].eq(True).to_numpy()
+
+        updated = delta.assign(
+            first_seen_at = np.where(existed, old["first_seen_at"], recorded_at),
+            first_level = np.where(existed, old["first_level"], delta["character_level"]),
+            first_rank = np.where(existed, old["first_rank"], delta["rank"]),
+            died_at = np.where(died, recorded_at, old["died_at"]),
+            updated_at = recorded_at
+        )
+
+        self.state = pd.concat(
+            [
+                self.state.drop(delta.index, errors = "ignore"),
+                updated
+            ]
+        ).astype(self.schema())
+
+        self.record_trend(recorded_at)
+
+        self.recorded_at = recorded_at
+
+
+
+
+    def record_trend(self, recorded_at: float):
+
+        stats = self.class_stats[self.class_stats["characters"] > 0]
+
+        self.class_trend = pd.concat(
+            [
+                self.class_trend,
+                pd.DataFrame(
+                    {
+                        "recorded_at": recorded_at,
+                        "character_class": stats.index,
+                        "characters": stats["characters"].to_numpy(),
+                        "mean_level": (stats["level_sum"] / stats["characters"]).round(1).to_numpy(),
+                        "death_rate": (stats["deaths"] / stats["characters"]).mul(100).round(2).to_numpy()
+                    }
+                )
+            ],
+            ignore_index = True
+        )
+
+
+
+
+    def append(self, ladder) -> int:
+
+        with self.lock:
+
+            self.reload_if_changed()
+
+            if ladder.loaded_at <= self.recorded_at:
+                return 0
+
+            current = ladder.df_origin.reindex(
+                columns = ["character_id", *TRACKED_COLUMNS]
+            ).set_index("character_id")
+
+            delta = self.diff(current)
+
+            if delta.empty:
+                return 0
+
+            self.seq += 1
+
+            self.segments.save(
+                f"{self.seq:08d}",
+                delta.reset_index(),
+                {
+                    "recorded_at": ladder.loaded_at,
+                    "league_id": self.league_id
+                }
+            )
+
+            self.apply(delta, ladder.loaded_at)
+
+            self.store.save(
+                "class_trend",
+                self.class_trend,
+                {
+                    "seq": self.seq
+                }
+            )
+            self.store.save(
+                "state",
+                self.state.reset_index(),
+                {
+                    "seq": self.seq,
+                    "recorded_at": self.recorded_at
+                }
+            )
+
+            self.view = HistoryView(self.state, self.class_trend, self.seq)
+
+            return len(delta)
+
+
+
+
+histories = {}
+
+histories_lock = Lock()
+
+
+
+
+def open_history(league_id: str, directory: str = HISTORY_DIR) -> LadderHistory:
+
+    with histories_lock:
+
+        key = (directory, league_id)
+
+        if key not in histories:
+            histories[key] = LadderHistory(league_id, directory)
+
+        return histories[key]
@@ -0,0 +1,141 @@
+from threading import RLock, local
+from time import perf_counter
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from analytics.instrumentation import instrumentation, stage
+
+
+
+
+class LazyTables():
+
+    derived = {}
+
+    frames = local()
+
+
+
+
+    def __getattr__(self, name: str):
+
+        builder = type(self).derived.get(name)
+
+        if builder is None:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+
+        method, dependencies = builder
+
+        with self.table_lock():
+
+            if name not in vars(self):
+                self.build(method, dependencies)
+
+        return vars(self)[name]
+
+
+
+
+    def table_lock(self) -> RLock:
+
+        return vars(self).setdefault("lazy_lock", RLock())
+
+
+
+
+    @property
+    def compute_seconds(self) -> dict:
+
+        return vars(self).setdefault("compute_seconds", {})
+
+
+
+
+    def build(self, method: str, dependencies: list):
+
+        for dependency in dependencies:
+            getattr(self, dependency)
+
+        stack = getattr(self.frames, "stack", None)
+
+        if stack is None:
+            stack = self.frames.stack = []
+
+        stack.append(0.0)
+        started_at = perf_counter()
+
+        try:
+
+            getattr(self, method)()
+
+        finally:
+
+            elapsed = perf_counter() - started_at
+            nested = stack.pop()
+
+            if stack:
+                stack[-1] += elapsed
+
+        self.compute_seconds[method] = elapsed - nested
+
+        instrumentation.record(
+            f"{type(self).__name__}.{method}",
+            elapsed - nested
+        )
+
+
+
+
+    def arrow(self, name: str, filters: "dict | None" = None) -> pa.Table:
+
+        table = vars(self).get("arrow_tables", {}).get(name)
+
+        if table is None:
+
+            with self.table_lock():
+
+                tables = vars(self).setdefault("arrow_tables", {})
+
+                if name not in tables:
+
+                    with stage(f"{type(self).__name__}.arrow.{name}") as record:
+
+                        tables[name] = pa.Table.from_pandas(
+                            getattr(self, name),
+                            preserve_index = False
+                        )
+
+                        record.rows = tables[name].num_rows
+                        record.bytes = tables[name].nbytes
+
+                table = tables[name]
+
+        masks = [
+            pc.is_in(
+                table[column],
+                value_set = pa.array(list(values), pa.string())
+            )
+            for column, values in (filters or {}).items()
+            if values
+        ]
+
+        if not masks:
+            return table
+
+        mask = masks[0]
+
+        for other in masks[1:]:
+            mask = pc.and_(mask, other)
+
+        return table.filter(mask)
+
+
+
+
+    def compute_all(self):
+
+        for name in type(self).derived:
+            getattr(self, name)
@@ -0,0 +1,144 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from analytics.ladder import Ladder
+from analytics.ladder_fetcher import LADDER_BURST, LADDER_MAX_WORKERS, LADDER_RATE_LIMIT, TokenBucket
+from analytics.lazy_tables import LazyTables
+
+
+
+
+def load_leagues(
+        league_ids: list,
+        previous: "dict | None" = None,
+        fetcher_options: "dict | None" = None,
+        max_workers: int = LADDER_MAX_WORKERS,
+        drop_columns: "list | None" = None
+) -> dict:
+
+    previous = previous or {}
+    fetcher_options = fetcher_options or {}
+
+    fetcher_options = {
+        "bucket": TokenBucket(
+            fetcher_options.get("rate_limit", LADDER_RATE_LIMIT),
+            fetcher_options.get("burst", LADDER_BURST)
+        ),
+        **fetcher_options
+    }
+
+    with ThreadPoolExecutor(max_workers) as executor:
+
+        futures = {
+            league_id: executor.submit(
+                Ladder,
+                previous = previous.get(league_id),
+                league_id = league_id,
+                fetcher_options = fetcher_options,
+                drop_columns = drop_columns
+            )
+            for league_id in league_ids
+        }
+
+        return {
+            league_id: future.result()
+            for league_id, future in futures.items()
+        }
+
+
+
+
+
+
+
+
+class LeagueComparison(LazyTables):
+
+    derived = {
+        "df_classes_share": ("prepare_df_classes_share", []),
+        "df_level_share": ("prepare_df_level_share", []),
+        "df_challenges_share": ("prepare_df_challenges_share", [])
+    }
+
+
+    def __init__(self, ladders: dict) -> None:
+
+        self.ladders = ladders
+
+
+
+
+    def tables(self) -> dict:
+
+        return {
+            "classes_share": self.df_classes_share,
+            "level_share": self.df_level_share,
+            "challenges_share": self.df_challenges_share
+        }
+
+
+
+
+    def metrics(self) -> dict:
+
+        return {
+            league_id: ladder.total_characters
+            for league_id, ladder in self.ladders.items()
+        }
+
+
+
+
+    def share(self, column: str) -> pd.DataFrame:
+
+        df = pd.concat(
+            {
+                league_id: ladder.df_origin[column]\
+                .value_counts(normalize = True)\
+                .mul(100)\
+                .round(2)
+                for league_id, ladder in self.ladders.items()
+            },
+            axis = 1
+        ).fillna(0)
+
+        return df[df.gt(0).any(axis = 1)]
+
+
+
+
+    def prepare_df_classes_share(self):
+
+        df = self.share("character_class")
+
+        self.df_classes_share = df.sort_values(
+            list(df.columns),
+            ascending = False
+        ).rename_axis(
+            "Подкласс"
+        ).reset_index()
+
+
+
+
+    def prepare_df_level_share(self):
+
+        self.df_level_share = self.share("character_level")\
+        .sort_index(
+            ascending = False
+        ).rename_axis(
+            "Уровень персонажа"
+        ).reset_index()
+
+
+
+
+    def prepare_df_challenges_share(self):
+
+        self.df_challenges_share = self.share("challenges")\
+        .sort_index(
+            ascending = False
+        ).rename_axis(
+            "Количество испытаний"
+        ).reset_index()
@@ -0,0 +1,52 @@
+import pandas as pd
+
+
+
+
+def memory_report(data_class) -> pd.DataFrame:
+
+    rows = [
+        {
+            "Объект": f"df_origin.{column}",
+            "Тип": str(data_class.df_origin[column].dtype),
+            "Байт": int(size)
+        }
+        for column, size in data_class.df_origin.memory_usage(
+            index = False,
+            deep = True
+        ).items()
+    ]
+
+    for name, value in vars(data_class).items():
+
+        if name == "df_origin" or not isinstance(value, (pd.DataFrame, pd.Series)):
+            continue
+
+        size = value.memory_usage(deep = True)
+
+        rows.append(
+            {
+                "Объект": name,
+                "Тип": type(value).__name__,
+                "Байт": int(size.sum() if isinstance(size, pd.Series) else size)
+            }
+        )
+
+    for name, table in vars(data_class).get("arrow_tables", {}).items():
+
+        rows.append(
+            {
+                "Объект": f"arrow.{name}",
+                "Тип": "pyarrow.Table",
+                "Байт": int(table.nbytes)
+            }
+        )
+
+    return pd.DataFrame(
+        rows,
+        columns = [
+            "Объект",
+            "Тип",
+            "Байт"
+        ]
+    )
@@ -0,0 +1,211 @@
+import re
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+
+SEARCH_LIMIT = 20
+
+NGRAM_SIZE = 3
+
+ACCOUNT_SUFFIX = re.compile(r"#\d+$")
+
+
+
+
+def normalize_name(value) -> str:
+
+    return str(value).strip().casefold()
+
+
+
+
+def account_key(value) -> str:
+
+    return ACCOUNT_SUFFIX.sub(
+        "",
+        normalize_name(value)
+    )
+
+
+
+
+class NameIndex():
+
+    def __init__(self, names: pd.Series) -> None:
+
+        names = names.astype(object)
+
+        codes, uniques = pd.factorize(
+            names.map(normalize_name, na_action = "ignore")
+        )
+
+        self.keys = list(uniques)
+        self.ids = {
+            key: key_id
+            for key_id, key in enumerate(self.keys)
+        }
+
+        order = np.argsort(codes, kind = "stable")
+        order = order[codes[order] >= 0]
+
+        self.row_order = order
+        self.row_bounds = np.searchsorted(
+            codes[order],
+            np.arange(len(self.keys) + 1)
+        )
+
+        self.names = names.to_numpy(dtype = object)[self.first_rows()]
+
+        self.sorted_ids = sorted(
+            range(len(self.keys)),
+            key = self.keys.__getitem__
+        )
+        self.sorted_keys = [
+            self.keys[key_id]
+            for key_id in self.sorted_ids
+        ]
+
+        self.ngrams = {}
+        self.accounts = {}
+
+        for key_id, key in enumerate(self.keys):
+
+            self.accounts.setdefault(account_key(key), []).append(key_id)
+
+            for ngram in {key[i:i + NGRAM_SIZE] for i in range(len(key) - NGRAM_SIZE + 1)}:
+                self.ngrams.setdefault(ngram, []).append(key_id)
+
+        self.joined = "\n".join(self.keys)
+        self.offsets = np.cumsum(
+            [0, *[len(key) + 1 for key in self.keys]]
+        )
+
+
+
+
+    def __len__(self) -> int:
+
+        return len(self.keys)
+
+
+
+
+    def find(self, name: str) -> "int | None":
+
+        return self.ids.get(
+            normalize_name(name)
+        )
+
+
+
+
+    def rows(self, key_id: int) -> np.ndarray:
+
+        return self.row_order[self.row_bounds[key_id]:self.row_bounds[key_id + 1]]
+
+
+
+
+    def first_rows(self) -> np.ndarray:
+
+        return self.row_order[self.row_bounds[:-1]]
+
+
+
+
+    def account_rows(self, name: str) -> np.ndarray:
+
+        key_id = self.find(name)
+        key_ids = [key_id] if key_id is not None else self.accounts.get(account_key(name), [])
+
+        return np.concatenate(
+            [
+                self.row_order[:0],
+                *map(self.rows, key_ids)
+            ]
+        )
+
+
+
+
+    def prefix(self, query: str, limit: int) -> list:
+
+        start = bisect_left(self.sorted_keys, query)
+        found = []
+
+        for position in range(start, len(self.sorted_keys)):
+
+            if len(found) >= limit or not self.sorted_keys[position].startswith(query):
+                break
+
+            found.append(self.sorted_ids[position])
+
+        return found
+
+
+
+
+    def substring(self, query: str, limit: int) -> list:
+
+        if len(query) < NGRAM_SIZE:
+
+            found = []
+            position = self.joined.find(query)
+
+            while position >= 0 and len(found) < limit:
+
+                key_id = int(np.searchsorted(self.offsets, position, side = "right")) - 1
+
+                found.append(key_id)
+
+                position = self.joined.find(query, self.offsets[key_id + 1])
+
+            return found
+
+        postings = sorted(
+            (
+                self.ngrams.get(query[i:i + NGRAM_SIZE], [])
+                for i in range(len(query) - NGRAM_SIZE + 1)
+            ),
+            key = len
+        )
+
+        candidates = set(postings[0])
+
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+
+        return sorted(
+            key_id
+            for key_id in candidates
+            if query in self.keys[key_id]
+        )[:limit]
+
+
+
+
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> list:
+
+        query = normalize_name(query)
+
+        if not query:
+            return []
+
+        found = self.prefix(query, limit)
+
+        if len(found) < limit:
+
+            seen = set(found)
+
+            found += [
+                key_id
+                for key_id in self.substring(query, limit + len(found))
+                if key_id not in seen
+            ][:limit - len(found)]
+
+        return [
+            self.names[key_id]
+            for key_id in found
+        ]
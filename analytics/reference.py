@@ -0,0 +1,151 @@
+import os
+from threading import Lock
+from time import time
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+from analytics.instrumentation import instrumentation
+
+
+REFERENCE_DIR = os.path.dirname(
+    os.path.dirname(
+        os.path.abspath(__file__)
+    )
+)
+
+REFERENCE_FILES = {
+    "abilities": ("умения.csv", "Умение"),
+    "classes": ("подклассы.csv", "Подкласс")
+}
+
+REFERENCE_CHECK_INTERVAL = 10
+
+
+
+
+class ReferenceData():
+
+    def __init__(self, abilities: list, classes: list, mtimes: "tuple | None" = None) -> None:
+
+        self.abilities = tuple(abilities)
+        self.classes = tuple(classes)
+        self.mtimes = mtimes
+
+        self.ability_dtype = pd.CategoricalDtype(self.abilities)
+        self.class_dtype = pd.CategoricalDtype(self.classes)
+
+        self.ability_codes = MappingProxyType(
+            {name: code for code, name in enumerate(self.abilities)}
+        )
+        self.class_codes = MappingProxyType(
+            {name: code for code, name in enumerate(self.classes)}
+        )
+
+
+
+
+    def encode(self, values: pd.Series, codes: MappingProxyType, dtype: pd.CategoricalDtype) -> pd.Categorical:
+
+        return pd.Categorical.from_codes(
+            values.map(codes).fillna(-1).to_numpy(dtype = np.int64),
+            dtype = dtype
+        )
+
+
+
+
+    def encode_abilities(self, values: pd.Series) -> pd.Categorical:
+
+        return self.encode(values, self.ability_codes, self.ability_dtype)
+
+
+
+
+    def encode_classes(self, values: pd.Series) -> pd.Categorical:
+
+        return self.encode(values, self.class_codes, self.class_dtype)
+
+
+
+
+
+
+
+
+class ReferenceCache():
+
+    def __init__(self, check_interval: float = REFERENCE_CHECK_INTERVAL) -> None:
+
+        self.check_interval = check_interval
+
+        self.entries = {}
+        self.checked_at = {}
+
+        self.lock = Lock()
+
+
+
+
+    def mtimes(self, directory: str) -> tuple:
+
+        return tuple(
+            os.stat(os.path.join(directory, file_name)).st_mtime_ns
+            for file_name, _ in REFERENCE_FILES.values()
+        )
+
+
+
+
+    def read(self, directory: str, mtimes: tuple) -> ReferenceData:
+
+        return ReferenceData(
+            **{
+                name: pd.read_csv(
+                    os.path.join(directory, file_name)
+                )[column].to_list()
+                for name, (file_name, column) in REFERENCE_FILES.items()
+            },
+            mtimes = mtimes
+        )
+
+
+
+
+    def get(self, directory: str) -> ReferenceData:
+
+        with self.lock:
+
+            reference = self.entries.get(directory)
+
+            if reference is not None and time() - self.checked_at[directory] < self.check_interval:
+                return reference
+
+            mtimes = self.mtimes(directory)
+
+            hit = reference is not None and reference.mtimes == mtimes
+
+            if not hit:
+                reference = self.entries[directory] = self.read(directory, mtimes)
+
+            instrumentation.record(
+                "ReferenceCache.get",
+                hit = hit
+            )
+
+            self.checked_at[directory] = time()
+
+            return reference
+
+
+
+
+reference_cache = ReferenceCache()
+
+
+
+
+def load_reference(directory: str = REFERENCE_DIR) -> ReferenceData:
+
+    return reference_cache.get(directory)
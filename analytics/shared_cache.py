@@ -0,0 +1,85 @@
+import os
+from time import time
+from urllib.parse import quote
+
+from analytics.download_cache import CACHE_DIR
+from analytics.file_lock import LOCK_TIMEOUT, FileLock
+from analytics.instrumentation import instrumentation
+from analytics.snapshot_store import SnapshotStore
+
+
+LOCK_DIR = os.path.join(CACHE_DIR, "locks")
+
+
+
+
+class SharedCache():
+
+    def __init__(self, store: "SnapshotStore | None" = None, lock_dir: str = LOCK_DIR, lock_timeout: float = LOCK_TIMEOUT) -> None:
+
+        self.store = store or SnapshotStore()
+        self.lock_dir = lock_dir
+        self.lock_timeout = lock_timeout
+
+
+
+
+    def lock(self, name: str) -> FileLock:
+
+        return FileLock(
+            os.path.join(self.lock_dir, f"{quote(name, safe = '')}.lock"),
+            self.lock_timeout
+        )
+
+
+
+
+    def load_shared(self, name: str, data_class, previous, max_age: float):
+
+        meta = self.store.meta(name)
+
+        if meta is None or time() - meta["loaded_at"] >= max_age:
+            return None
+
+        if previous is not None and previous.source != "snapshot" and previous.loaded_at >= meta["loaded_at"]:
+            return None
+
+        snapshot = self.store.load(name)
+
+        if snapshot is None:
+            return None
+
+        data = data_class.from_snapshot(*snapshot)
+        data.source = "shared"
+
+        return data
+
+
+
+
+    def get(self, name: str, data_class, previous, max_age: float, build):
+
+        data = self.load_shared(name, data_class, previous, max_age)
+
+        if data is None:
+
+            with self.lock(name):
+
+                data = self.load_shared(name, data_class, previous, max_age)
+
+                if data is None:
+
+                    data = build(previous)
+
+                    self.store.save(
+                        name,
+                        data.df_origin,
+                        data.snapshot_meta()
+                    )
+
+        instrumentation.record(
+            f"SharedCache.{name.partition(':')[0]}",
+            hit = data.source == "shared"
+        )
+
+        return data
@@ -0,0 +1,301 @@
+import logging
+from threading import Lock, Thread
+
+import numpy as np
+import pandas as pd
+
+from analytics.google_doc import GoogleDoc
+from analytics.ladder import Ladder
+from analytics.lazy_tables import LazyTables
+from analytics.player_search import NameIndex, account_key
+
+
+
+
+def index_rows(index: NameIndex) -> tuple:
+
+    return np.repeat(
+        np.arange(len(index)),
+        np.diff(index.row_bounds)
+    ), index.row_order
+
+
+
+
+class SheetLadderJoin(LazyTables):
+
+    derived = {
+        "sheet_side": ("prepare_sheet_side", []),
+        "ladder_side": ("prepare_ladder_side", []),
+        "ladder_classes": ("prepare_ladder_side", []),
+        "matched_players": ("prepare_matches", ["sheet_side", "ladder_side"]),
+        "df_unmatched_sheet": ("prepare_df_unmatched_sheet", ["sheet_side", "ladder_side"]),
+        "df_unmatched_ladder": ("prepare_df_unmatched_ladder", ["sheet_side", "ladder_side"]),
+        "df_class_mismatch": ("prepare_df_class_mismatch", ["sheet_side", "ladder_side", "ladder_classes"])
+    }
+
+    warming = False
+
+
+    def __init__(self, google_doc: GoogleDoc, ladder: Ladder, previous: "SheetLadderJoin | None" = None) -> None:
+
+        self.google_doc = google_doc
+        self.ladder = ladder
+
+        if previous is not None and previous.google_doc is google_doc:
+            self.sheet_side = previous.sheet_side
+
+        if previous is not None and previous.ladder is ladder:
+
+            self.ladder_side = previous.ladder_side
+            self.ladder_classes = previous.ladder_classes
+
+
+
+
+    def is_current(self, google_doc: GoogleDoc, ladder: Ladder) -> bool:
+
+        return self.google_doc is google_doc and self.ladder is ladder
+
+
+
+
+    @property
+    def is_warm(self) -> bool:
+
+        return all(
+            name in vars(self)
+            for name in type(self).derived
+        )
+
+
+
+
+    def warm(self):
+
+        try:
+
+            self.compute_all()
+
+        except Exception as e:
+
+            logging.error(
+                e
+            )
+
+        finally:
+
+            self.warming = False
+
+
+
+
+    def tables(self) -> dict:
+
+        return {
+            "unmatched_sheet": self.df_unmatched_sheet,
+            "unmatched_ladder": self.df_unmatched_ladder,
+            "class_mismatch": self.df_class_mismatch
+        }
+
+
+
+
+    def metrics(self) -> dict:
+
+        return {
+            "matched_players": self.matched_players,
+            "unmatched_sheet": len(self.df_unmatched_sheet),
+            "class_mismatch": len(self.df_class_mismatch)
+        }
+
+
+
+
+    def prepare_sheet_side(self):
+
+        index = self.google_doc.login_index
+
+        keys = pd.Index(
+            [account_key(key) for key in index.keys],
+            name = "key",
+            dtype = object
+        )
+
+        sheet_side = pd.DataFrame(
+            {
+                "Логин": index.names,
+                "Подкласс": self.google_doc.df_origin["Подкласс"].iloc[
+                    index.first_rows()
+                ].to_numpy(dtype = object)
+            },
+            index = keys
+        )
+
+        self.sheet_side = sheet_side[~keys.duplicated()]
+
+
+
+
+    def prepare_ladder_side(self):
+
+        index = self.ladder.account_index
+        key_ids, rows = index_rows(index)
+
+        account_ids, accounts = pd.factorize(
+            np.array([account_key(key) for key in index.keys], dtype = object)
+        )
+
+        df = pd.DataFrame(
+            {
+                "key_id": account_ids[key_ids],
+                "character_class": self.ladder.df_origin["character_class"].iloc[rows].astype(str).to_numpy(),
+                "character_level": self.ladder.df_origin["character_level"].iloc[rows].to_numpy()
+            }
+        )
+
+        keys = pd.Index(accounts, name = "key", dtype = object)
+
+        grouped = df.groupby("key_id")
+
+        self.ladder_side = pd.DataFrame(
+            {
+                "Аккаунт": pd.Series(index.names, dtype = object).groupby(account_ids).agg(", ".join).reindex(range(len(keys))).to_numpy(),
+                "Персонажей": grouped.size().reindex(range(len(keys)), fill_value = 0).to_numpy(),
+                "Максимальный уровень": grouped["character_level"].max().reindex(range(len(keys))).to_numpy()
+            },
+            index = keys
+        )
+
+        self.ladder_classes = pd.MultiIndex.from_arrays(
+            [
+                keys[df["key_id"].to_numpy()],
+                df["character_class"].to_numpy()
+            ],
+            names = [
+                "key",
+                "character_class"
+            ]
+        ).unique()
+
+
+
+
+    def prepare_matches(self):
+
+        self.matched_players = int(
+            self.sheet_side.index.isin(self.ladder_side.index).sum()
+        )
+
+
+
+
+    def prepare_df_unmatched_sheet(self):
+
+        self.df_unmatched_sheet = self.sheet_side[
+            ~self.sheet_side.index.isin(self.ladder_side.index)
+        ].sort_values(
+            "Логин"
+        ).reset_index(
+            drop = True
+        )
+
+
+
+
+    def prepare_df_unmatched_ladder(self):
+
+        self.df_unmatched_ladder = self.ladder_side[
+            ~self.ladder_side.index.isin(self.sheet_side.index)
+        ].sort_values(
+            [
+                "Максимальный уровень",
+                "Аккаунт"
+            ],
+            ascending = [
+                False,
+                True
+            ]
+        ).reset_index(
+            drop = True
+        )
+
+
+
+
+    def prepare_df_class_mismatch(self):
+
+        matched = self.sheet_side[
+            self.sheet_side.index.isin(self.ladder_side.index)
+            & self.sheet_side["Подкласс"].notna()
+        ]
+
+        declared = pd.MultiIndex.from_arrays(
+            [
+                matched.index,
+                matched["Подкласс"]
+            ]
+        )
+
+        mismatched = matched[~declared.isin(self.ladder_classes)]
+
+        ladder_classes = pd.Series(
+            self.ladder_classes.get_level_values(1),
+            index = self.ladder_classes.get_level_values(0)
+        )
+        ladder_classes = ladder_classes[ladder_classes.index.isin(mismatched.index)]\
+        .groupby(level = 0)\
+        .agg(lambda classes: ", ".join(sorted(classes)))
+
+        self.df_class_mismatch = mismatched.assign(
+            **{
+                "Подклассы в ладдере": ladder_classes.reindex(mismatched.index).to_numpy(),
+                "Персонажей": self.ladder_side["Персонажей"].reindex(mismatched.index).to_numpy()
+            }
+        ).sort_values(
+            "Логин"
+        ).reset_index(
+            drop = True
+        )
+
+
+
+
+joins = {}
+
+joins_lock = Lock()
+
+
+
+
+def open_join(google_doc: GoogleDoc, ladder: Ladder) -> SheetLadderJoin:
+
+    with joins_lock:
+
+        join = joins.get(ladder.league_id)
+
+        if join is None or not join.is_current(google_doc, ladder):
+            join = joins[ladder.league_id] = SheetLadderJoin(google_doc, ladder, join)
+
+        return join
+
+
+
+
+def prepare_join(google_doc: GoogleDoc, ladder: Ladder) -> SheetLadderJoin:
+
+    join = open_join(google_doc, ladder)
+
+    with joins_lock:
+
+        if join.is_warm or join.warming:
+            return join
+
+        join.warming = True
+
+    Thread(
+        target = join.warm,
+        daemon = True
+    ).start()
+
+    return join
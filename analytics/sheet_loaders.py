@@ -0,0 +1,212 @@
+from abc import ABC, abstractmethod
+from importlib.util import find_spec
+
+import pandas as pd
+from openpyxl import load_workbook
+
+
+SHEET_ENGINE = "auto"
+
+
+
+
+class SheetLoader(ABC):
+
+    name = "base"
+
+    format = "xlsx"
+
+
+    @abstractmethod
+    def read(self, path: str, sheet_name: str, columns: list) -> pd.DataFrame:
+
+        pass
+
+
+
+
+    @staticmethod
+    def is_available() -> bool:
+
+        return True
+
+
+
+
+
+
+
+
+class OpenpyxlLoader(SheetLoader):
+
+    name = "openpyxl"
+
+
+    def read(self, path: str, sheet_name: str, columns: list) -> pd.DataFrame:
+
+        return pd.read_excel(
+            path,
+            sheet_name = sheet_name,
+            usecols = columns,
+            engine = "openpyxl"
+        )
+
+
+
+
+
+
+
+
+class CalamineLoader(SheetLoader):
+
+    name = "calamine"
+
+
+    def read(self, path: str, sheet_name: str, columns: list) -> pd.DataFrame:
+
+        return pd.read_excel(
+            path,
+            sheet_name = sheet_name,
+            usecols = columns,
+            engine = "calamine"
+        )
+
+
+
+
+    @staticmethod
+    def is_available() -> bool:
+
+        return find_spec("python_calamine") is not None
+
+
+
+
+
+
+
+
+class StreamingXlsxLoader(SheetLoader):
+
+    name = "openpyxl_read_only"
+
+
+    def read(self, path: str, sheet_name: str, columns: list) -> pd.DataFrame:
+
+        workbook = load_workbook(
+            path,
+            read_only = True,
+            data_only = True
+        )
+
+        try:
+
+            rows = workbook[sheet_name].iter_rows(
+                values_only = True
+            )
+
+            header = next(rows)
+
+            wanted = set(columns)
+
+            positions = [
+                position
+                for position, column in enumerate(header)
+                if column in wanted
+            ]
+
+            missing = wanted.difference(header)
+
+            if missing:
+                raise ValueError(
+                    f"Usecols do not match columns, columns expected but not found: {sorted(missing)}"
+                )
+
+            records = []
+            blank_rows = 0
+
+            for row in rows:
+
+                record = [
+                    row[position] if position < len(row) else None
+                    for position in positions
+                ]
+
+                if all(value is None for value in record):
+
+                    blank_rows += 1
+
+                    continue
+
+                records.extend(
+                    [[None] * len(positions)] * blank_rows
+                )
+                records.append(record)
+
+                blank_rows = 0
+
+        finally:
+
+            workbook.close()
+
+        return pd.DataFrame.from_records(
+            records,
+            columns = [header[position] for position in positions]
+        )
+
+
+
+
+
+
+
+
+class CsvLoader(SheetLoader):
+
+    name = "csv"
+
+    format = "csv"
+
+
+    def read(self, path: str, sheet_name: str, columns: list) -> pd.DataFrame:
+
+        return pd.read_csv(
+            path,
+            usecols = columns
+        )
+
+
+
+
+
+
+
+
+LOADERS = {
+    loader.name: loader
+    for loader in [
+        OpenpyxlLoader,
+        CalamineLoader,
+        StreamingXlsxLoader,
+        CsvLoader
+    ]
+}
+
+
+
+
+def choose_loader(engine: str = SHEET_ENGINE) -> SheetLoader:
+
+    if engine == "auto":
+
+        engine = "calamine" if CalamineLoader.is_available() else "openpyxl_read_only"
+
+    loader = LOADERS[engine]
+
+    if not loader.is_available():
+        raise ImportError(
+            f"Sheet engine {engine!r} is not installed"
+        )
+
+    return loader()
@@ -0,0 +1,100 @@
+import json
+import os
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+
+from analytics.download_cache import CACHE_DIR
+from analytics.instrumentation import stage
+
+
+SNAPSHOT_DIR = os.path.join(CACHE_DIR, "snapshots")
+
+META_KEY = b"snapshot_meta"
+
+
+
+
+class SnapshotStore():
+
+    def __init__(self, directory: str = SNAPSHOT_DIR) -> None:
+
+        self.directory = directory
+
+        os.makedirs(
+            directory,
+            exist_ok = True
+        )
+
+
+
+
+    def path(self, name: str) -> str:
+
+        return os.path.join(self.directory, f"{quote(name, safe = '')}.arrow")
+
+
+
+
+    def save(self, name: str, df: pd.DataFrame, meta: dict):
+
+        table = pa.Table.from_pandas(
+            df,
+            preserve_index = False
+        )
+
+        table = table.replace_schema_metadata(
+            {
+                **table.schema.metadata,
+                META_KEY: json.dumps(meta).encode("utf-8")
+            }
+        )
+
+        tmp_path = f"{self.path(name)}.tmp"
+
+        with pa.OSFile(tmp_path, "wb") as sink:
+
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        os.replace(tmp_path, self.path(name))
+
+
+
+
+    def meta(self, name: str) -> "dict | None":
+
+        if not os.path.exists(self.path(name)):
+            return None
+
+        with pa.memory_map(self.path(name), "r") as source:
+
+            return json.loads(
+                pa.ipc.open_file(source).schema.metadata[META_KEY]
+            )
+
+
+
+
+    def load(self, name: str) -> "tuple[pd.DataFrame, dict] | None":
+
+        if not os.path.exists(self.path(name)):
+            return None
+
+        with stage("SnapshotStore.load") as record:
+
+            with pa.memory_map(self.path(name), "r") as source:
+
+                table = pa.ipc.open_file(source).read_all()
+
+            meta = json.loads(
+                table.schema.metadata[META_KEY]
+            )
+
+            df = table.to_pandas()
+
+            record.rows = len(df)
+            record.bytes = table.nbytes
+
+        return df, meta
@@ -0,0 +1,347 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from time import perf_counter
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from analytics.download_cache import CachedDownload
+from analytics.google_doc import GoogleDoc
+from analytics.ladder import Ladder
+from analytics.ladder_columns import LadderColumns
+from analytics.ladder_fetcher import LADDER_PAGE_SIZE, LadderFetcher
+from analytics.reference import load_reference
+from analytics.sheet_loaders import SHEET_ENGINE, choose_loader
+from benchmarks.synthetic import make_ladder_pages, make_participants, write_workbook
+
+
+RESULTS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "results"
+)
+
+DEFAULT_SIZES = "1000,10000,100000,1000000"
+
+class FixtureServer():
+
+    def __init__(self, sheet_path: str, pages: list) -> None:
+
+        with open(sheet_path, "rb") as file:
+            sheet = file.read()
+
+        bodies = [json.dumps(page).encode("utf-8") for page in pages]
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+
+                url = urlparse(self.path)
+
+                if url.path == "/sheet.xlsx":
+
+                    body = sheet
+
+                else:
+
+                    offset = int(parse_qs(url.query)["offset"][0])
+                    body = bodies[offset // LADDER_PAGE_SIZE]
+
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+        Thread(
+            target = self.server.serve_forever,
+            daemon = True
+        ).start()
+
+
+
+
+    def close(self):
+
+        self.server.shutdown()
+        self.server.server_close()
+
+
+
+
+
+
+
+
+def measure(function, repeat: int) -> "tuple[float, object]":
+
+    timings = []
+
+    for _ in range(repeat):
+
+        started_at = perf_counter()
+
+        result = function()
+
+        timings.append(perf_counter() - started_at)
+
+    return min(timings), result
+
+
+
+
+def measure_tables(data_class, repeat: int) -> dict:
+
+    timings = {}
+
+    for _ in range(repeat):
+
+        fresh = type(data_class).from_snapshot(
+            data_class.df_origin,
+            data_class.snapshot_meta()
+        )
+        fresh.compute_all()
+
+        stages = dict(fresh.compute_seconds)
+
+        if "aggregates" in vars(fresh):
+
+            stages.update(
+                {
+                    f"aggregates.{stage}": seconds
+                    for stage, seconds in fresh.aggregates.compute_seconds.items()
+                }
+            )
+
+        for stage, seconds in stages.items():
+            timings[stage] = min(timings.get(stage, seconds), seconds)
+
+    return timings
+
+
+
+
+def bench_google_doc(rows: int, directory: str, server: FixtureServer, engine: str, repeat: int) -> dict:
+
+    reference = load_reference()
+    loader = choose_loader(engine)
+    results = {}
+
+    def download():
+
+        return CachedDownload(
+            f"{server.url}/sheet.xlsx",
+            f"sheet_{rows}.xlsx",
+            cache_dir = tempfile.mkdtemp(dir = directory)
+        ).fetch()
+
+    results["download"], _ = measure(download, repeat)
+
+    sheet_path = os.path.join(directory, "sheet.xlsx")
+
+    results["parse"], _ = measure(
+        lambda: loader.read(sheet_path, GoogleDoc.sheet_name, GoogleDoc.main_columns),
+        repeat
+    )
+
+    results["construct"], data_class = measure(
+        lambda: GoogleDoc(reference, path = sheet_path, engine = engine),
+        repeat
+    )
+
+    results.update(
+        measure_tables(data_class, repeat)
+    )
+
+    return results
+
+
+
+
+def bench_ladder(characters: int, pages: list, server: FixtureServer, repeat: int) -> dict:
+
+    fetcher_options = {
+        "link": f"{server.url}/api/ladders",
+        "rate_limit": 1_000_000,
+        "burst": 1_000_000
+    }
+    results = {}
+
+    def fetch():
+
+        return sum(
+            len(entries)
+            for _, entries in LadderFetcher("bench", **fetcher_options).fetch_pages()
+        )
+
+    results["download"], _ = measure(fetch, repeat)
+
+    def ingest():
+
+        columns = LadderColumns(characters)
+
+        for page in pages:
+            columns.append_page(page["entries"])
+
+        return columns.to_frame()
+
+    results["parse"], _ = measure(ingest, repeat)
+
+    results["construct"], data_class = measure(
+        lambda: Ladder(league_id = "bench", fetcher_options = fetcher_options),
+        repeat
+    )
+
+    results.update(
+        measure_tables(data_class, repeat)
+    )
+
+    return results
+
+
+
+
+def environment() -> dict:
+
+    try:
+
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output = True,
+            text = True,
+            check = True
+        ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+
+        commit = None
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "started_at": datetime.now().isoformat(timespec = "seconds")
+    }
+
+
+
+
+def compare(current: dict, baseline: dict, threshold: float, min_seconds: float):
+
+    print(f"\n{'stage':<60} {'baseline':>10} {'current':>10} {'ratio':>7}")
+
+    for key, seconds in current["timings"].items():
+
+        previous = baseline["timings"].get(key)
+
+        if not previous:
+            continue
+
+        ratio = seconds / previous
+        flag = "  REGRESSION" if ratio > threshold and seconds >= min_seconds else ""
+
+        print(f"{key:<60} {previous:10.4f} {seconds:10.4f} {ratio:7.2f}{flag}")
+
+
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description = "Time every GoogleDoc and Ladder pipeline stage on synthetic data"
+    )
+    parser.add_argument("--sizes", default = DEFAULT_SIZES, help = "comma separated row counts")
+    parser.add_argument("--engine", default = SHEET_ENGINE)
+    parser.add_argument("--repeat", type = int, default = 3)
+    parser.add_argument("--skip-google-doc", action = "store_true")
+    parser.add_argument("--skip-ladder", action = "store_true")
+    parser.add_argument("--output", help = "result file, defaults to benchmarks/results/<timestamp>.json")
+    parser.add_argument("--compare", help = "baseline result file to compare against")
+    parser.add_argument("--threshold", type = float, default = 1.2, help = "ratio reported as a regression")
+    parser.add_argument("--min-seconds", type = float, default = 0.001, help = "ignore regressions in stages faster than this")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    current = {
+        "environment": environment(),
+        "engine": args.engine,
+        "timings": {}
+    }
+
+    for size in sizes:
+
+        with tempfile.TemporaryDirectory() as directory:
+
+            sheet_path = os.path.join(directory, "sheet.xlsx")
+
+            if not args.skip_google_doc:
+                write_workbook(make_participants(size), sheet_path)
+            else:
+                open(sheet_path, "wb").close()
+
+            pages = [] if args.skip_ladder else make_ladder_pages(size)
+
+            server = FixtureServer(sheet_path, pages)
+
+            try:
+
+                stages = {}
+
+                if not args.skip_google_doc:
+                    stages["google_doc"] = bench_google_doc(size, directory, server, args.engine, args.repeat)
+
+                if not args.skip_ladder:
+                    stages["ladder"] = bench_ladder(size, pages, server, args.repeat)
+
+            finally:
+
+                server.close()
+
+        for source, timings in stages.items():
+
+            for stage, seconds in timings.items():
+
+                key = f"{source}.{stage}[{size}]"
+
+                current["timings"][key] = seconds
+
+                print(f"{key:<60} {seconds:10.4f}s")
+
+    output = args.output or os.path.join(
+        RESULTS_DIR,
+        f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok = True)
+
+    with open(output, "w", encoding = "utf-8") as file:
+        json.dump(current, file, indent = 2, ensure_ascii = False)
+
+    print(f"\nsaved {output}")
+
+    if args.compare:
+
+        with open(args.compare, encoding = "utf-8") as file:
+            compare(current, json.load(file), args.threshold, args.min_seconds)
+
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import os
+import tempfile
+from time import perf_counter
+
+import pandas as pd
+
+from analytics.google_doc import GoogleDoc
+from analytics.sheet_loaders import LOADERS
+from benchmarks.synthetic import make_participants, write_workbook
+
+
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description = "Compare sheet engines on a synthetic participants workbook"
+    )
+    parser.add_argument("--rows", type = int, default = 20_000)
+    parser.add_argument("--extra-columns", type = int, default = 40)
+    parser.add_argument("--repeat", type = int, default = 3)
+    args = parser.parse_args()
+
+    df = make_participants(args.rows)
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        paths = {
+            "xlsx": os.path.join(directory, "sheet.xlsx"),
+            "csv": os.path.join(directory, "sheet.csv")
+        }
+
+        write_workbook(df, paths["xlsx"], args.extra_columns)
+        df.to_csv(paths["csv"], index = False)
+
+        reference = None
+
+        for name, loader_class in LOADERS.items():
+
+            if not loader_class.is_available():
+
+                print(f"{name:<20} not installed")
+
+                continue
+
+            loader = loader_class()
+
+            timings = []
+
+            for _ in range(args.repeat):
+
+                started_at = perf_counter()
+
+                result = loader.read(
+                    paths[loader.format],
+                    GoogleDoc.sheet_name,
+                    GoogleDoc.main_columns
+                )
+
+                timings.append(perf_counter() - started_at)
+
+            if reference is None:
+                reference = result
+
+            pd.testing.assert_frame_equal(
+                result,
+                reference
+            )
+
+            print(
+                f"{name:<20} best {min(timings):7.3f}s  "
+                f"mean {sum(timings) / len(timings):7.3f}s  "
+                f"rows {len(result)}"
+            )
+
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+from analytics.google_doc import GoogleDoc
+from analytics.ladder_fetcher import LADDER_PAGE_SIZE
+from analytics.reference import load_reference
+
+
+
+
+def make_participants(rows: int, seed: int = 0) -> pd.DataFrame:
+
+    rng = np.random.default_rng(seed)
+
+    reference = load_reference()
+
+    abilities = np.array(reference.abilities, dtype = object)
+    classes = np.array(reference.classes, dtype = object)
+
+    logins = np.array(
+        [f"player_{number}" for number in range(rows)],
+        dtype = object
+    )
+
+    duplicated = rng.random(rows) < 0.01
+    logins[duplicated] = logins[rng.integers(0, rows, duplicated.sum())]
+    logins[rng.random(rows) < 0.005] = None
+
+    df = pd.DataFrame(
+        {
+            "Логин": logins,
+            "Подкласс": rng.choice(classes, rows),
+            "Умение": rng.choice(abilities, rows),
+            "Был реролл": rng.choice([np.nan, 1, 2], rows, p = [0.7, 0.2, 0.1])
+        }
+    )
+
+    kill_chances = np.linspace(0.6, 0.02, len(GoogleDoc.bosses_columns))
+
+    for boss, chance in zip(GoogleDoc.bosses_columns, kill_chances):
+
+        df[boss] = np.where(
+            rng.random(rows) < chance,
+            rng.integers(1, 3, rows),
+            np.nan
+        )
+
+    return df
+
+
+
+
+def write_workbook(df: pd.DataFrame, path: str, extra_columns: int = 0):
+
+    with pd.ExcelWriter(path, engine = "xlsxwriter") as writer:
+
+        pd.DataFrame(
+            {
+                "Правила": ["..."]
+            }
+        ).to_excel(
+            writer,
+            sheet_name = "Правила",
+            index = False
+        )
+
+        sheet = df.assign(
+            **{
+                f"Заметки {number}": "" for number in range(extra_columns)
+            }
+        )
+        sheet.to_excel(
+            writer,
+            sheet_name = GoogleDoc.sheet_name,
+            index = False
+        )
+
+        highlight = writer.book.add_format(
+            {
+                "bg_color": "#FFF2CC",
+                "border": 1
+            }
+        )
+        writer.sheets[GoogleDoc.sheet_name].set_column(
+            0,
+            sheet.shape[1],
+            None,
+            highlight
+        )
+
+
+
+
+def make_ladder_entries(characters: int, seed: int = 0) -> list:
+
+    rng = np.random.default_rng(seed)
+
+    classes = load_reference().classes
+
+    levels = np.clip(
+        rng.normal(80, 15, characters).round(),
+        1,
+        100
+    ).astype(int)
+    levels[::-1].sort()
+
+    accounts = rng.integers(0, max(characters // 3, 1), characters)
+    challenges = rng.integers(0, 41, characters)
+    has_depth = rng.random(characters) < 0.3
+    depths = rng.integers(1, 300, characters)
+    class_names = rng.choice(classes, characters)
+    dead = rng.random(characters) < 0.02
+
+    return [
+        {
+            "rank": number + 1,
+            "dead": bool(dead[number]),
+            "public": True,
+            "character": {
+                "id": f"{number:064x}",
+                "name": f"Character_{number}",
+                "level": int(levels[number]),
+                "class": class_names[number],
+                **(
+                    {"depth": {"default": int(depths[number]), "solo": int(depths[number])}}
+                    if has_depth[number] else {}
+                )
+            },
+            "account": {
+                "name": f"account_{accounts[number]}#{accounts[number] % 10000:04d}",
+                "challenges": {
+                    "completed": int(challenges[number])
+                }
+            }
+        }
+        for number in range(characters)
+    ]
+
+
+
+
+def make_ladder_pages(characters: int, seed: int = 0) -> list:
+
+    entries = make_ladder_entries(characters, seed)
+
+    return [
+        {
+            "total": characters,
+            "entries": entries[offset:offset + LADDER_PAGE_SIZE]
+        }
+        for offset in range(0, max(characters, 1), LADDER_PAGE_SIZE)
+    ]
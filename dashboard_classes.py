@@ -1,375 +1,455 @@
-import pandas as pd
+import logging
+import os
 import streamlit as st
-from numpy import nan
-from time import sleep
-import requests
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+from datetime import datetime
+from time import time
+from analytics import GoogleDoc, Ladder, LeagueComparison, ReferenceData, SharedCache, SnapshotStore, TokenBucket, load_reference, memory_report, open_history, prepare_join
+from analytics.download_cache import CACHE_DIR
+from analytics.instrumentation import MetricsExporter, instrumentation, timed
+from analytics.ladder_fetcher import LADDER_BURST, LADDER_RATE_LIMIT
+from analytics.player_search import SEARCH_LIMIT
+from data_slot import DataSlot, Refresher, SlotCache
+from view_cache import ViewCache, normalize_selection
 
 
 TTL_TIME = 60 * 30
 
+REFRESH_AFTER = TTL_TIME - 60 * 5
 
-class GoogleDoc():
-    link = "https://docs.google.com/spreadsheets/d/1XiP5ss6ijjE5iiBC09C7lUW0ngV3QJt0hGRa_Zwufy8/export#gid=690744568#gid=690744568&format=xlsx"
-
-    main_columns = [
-        "Логин",
-        "Подкласс",
-        "Умение",
-        "Был реролл",
-        "Пожиратель",
-        "Экзарх",
-        "Древний",
-        "Создатель",
-        "Кора",
-        "Ол",
-        "Ошаби",
-        "Убер Древний",
-        "Олрот",
-        "Убер Атзири",
-        "Сирус",
-        "Мейвен",
-        "Убийцы Древнего",
-        "Сокрытые",
-        "Убер Пожиратель",
-        "Убер Экзарх",
-        "Убер Убер Древний",
-        "Убер Создатель",
-        "Убер Кора",
-        "Убер Сирус",
-        "Убер Мейвен",
-        "Внушающие страх",
-        "Симулякр 15"
-    ]
-
-    bosses_columns = main_columns[4:]
-
-    reroll_map = {
-        nan: "Без реролла",
-        1: "Один реролл",
-        2: "Два реролла"
-    }
+RETRY_AFTER = 60
+
+LADDER_LEAGUES = [
+    Ladder.league_id
+]
+
+MAX_COMPARED_LEAGUES = 4
+
+MAX_ADHOC_LEAGUES = 8
+
+METRICS_PATHS = [
+    os.path.join(CACHE_DIR, "metrics.prom"),
+    os.path.join(CACHE_DIR, "metrics.json")
+]
 
 
 
 
+class Dashboard():
+    
+
+    spinners = {
+        "google_doc": "Загружаю данные из Google Docs",
+        "ladder": "Загружаю данные из ладдера"
+    }
+
+
     def __init__(self) -> None:
 
-        self.load_data()
-        self.find_duplicated_flag()
-        self.find_nunique_players()
-        self.prepare_df_combination_frequency()
-        self.prepare_df_coins_for_bosses()
-        self.prepare_df_classes_frequency()
-        self.prepare_df_abilities_frequency()
-        self.prepare_df_reroll_frequency()
-        self.find_total_coins_for_bosses()
-        self.find_total_players_with_coins_for_bosses()
-        self.prepare_df_coins_frequency()
-
-
-    def load_data(self):
-
-        self.df_origin = pd.read_excel(
-            self.link,
-            sheet_name = "Участники",
-            usecols = self.main_columns
-        ).dropna(
-            subset = [
-                "Логин"
-            ]
-        )
+        self.reference: ReferenceData = load_reference()
 
-        self.df_origin["Умение"] = pd.Categorical(
-            self.df_origin["Умение"],
-            categories = st.session_state["abilities"]
-        )
+        self.google_doc: GoogleDoc = self.load_data("google_doc")
 
-        self.df_origin["Подкласс"] = pd.Categorical(
-            self.df_origin["Подкласс"],
-            categories = st.session_state["classes"]
-        )
+        self.league_id = LADDER_LEAGUES[0]
 
-        
-        self.df_origin["Был реролл"] = self.df_origin["Был реролл"].map(self.reroll_map)
-        self.df_origin["Был реролл"] = pd.Categorical(
-            self.df_origin["Был реролл"],
-            categories = self.reroll_map.values()
-        )
+        try:
 
+            self.ladder: "Ladder | None" = self.load_data(self.ladder_name(self.league_id))
 
+        except Exception as e:
 
+            logging.error(
+                e
+            )
+
+            self.ladder = None
 
-    def find_duplicated_flag(self):
+        self.join = prepare_join(self.google_doc, self.ladder) if self.ladder is not None else None
 
-        self.is_login_duplicated = self.df_origin["Логин"].duplicated().any()
+        self.load_refresher()
+        self.load_metrics_exporter()
 
+        self.view_cache: ViewCache = self.load_view_cache()
+        self.view_cache.set_version(self.google_doc.content_hash)
 
     
-    def find_nunique_players(self):
 
-        self.nunique_players = self.df_origin["Логин"].nunique()
 
+    @st.cache_resource
+    @staticmethod
+    def load_slots(_self):
 
+        return {
+            name: DataSlot()
+            for name in ["google_doc", *map(_self.ladder_name, LADDER_LEAGUES)]
+        }
 
 
-    def prepare_df_combination_frequency(self):
 
-        self.df_combination_frequency = self.df_origin.groupby(
-            [
-                "Подкласс",
-                "Умение"
-            ],
-            as_index = False,
-            observed = True
-        ).size()\
-        .rename(
-            columns = {
-                "size": "Количество игроков"
-            }
-        ).sort_values(
-            [
-                "Количество игроков",
-                "Подкласс",
-                "Умение"
-            ],
-            ascending = [
-                False,
-                True,
-                True
-            ]
+    @st.cache_resource
+    @staticmethod
+    def load_adhoc_slots(_self):
+
+        return SlotCache(MAX_ADHOC_LEAGUES)
+
+
+
+    @st.cache_resource
+    @staticmethod
+    def load_view_cache(_self):
+
+        return ViewCache()
+
+
+
+    @st.cache_resource
+    @staticmethod
+    def load_snapshot_store(_self):
+
+        return SnapshotStore()
+
+
+
+    @st.cache_resource
+    @staticmethod
+    def load_shared_cache(_self):
+
+        return SharedCache(
+            _self.load_snapshot_store()
         )
 
 
 
-    
-    def prepare_df_coins_for_bosses(self):
+    @st.cache_resource
+    @staticmethod
+    def load_ladder_bucket(_self):
 
-        self.df_coins_for_bosses = self.df_origin[self.bosses_columns].apply(
-            [
-                "sum",
-                "count"
-            ]
-        ).T\
-        .reset_index()\
-        .rename(
-            columns = {
-                "sum": "Сумма монет",
-                "count": "Количество убийств",
-                "index": "Имя босса"
-            }
-        ).sort_values(
-            [
-                "Сумма монет",
-                "Имя босса"
-            ],
-            ascending = [
-                False,
-                True
-            ]
+        return TokenBucket(LADDER_RATE_LIMIT, LADDER_BURST)
+
+
+
+
+    def ladder_name(self, league_id: str) -> str:
+
+        return f"ladder:{league_id}"
+
+
+
+
+    def get_slot(self, name: str) -> DataSlot:
+
+        return self.load_slots()[name]
+
+
+
+
+    def get_data_class(self, name: str):
+
+        return {
+            "google_doc": GoogleDoc,
+            "ladder": Ladder
+        }[name.partition(":")[0]]
+
+
+
+
+    def make_factory(self, name: str):
+
+        data_class = self.get_data_class(name)
+        shared_cache = self.load_shared_cache()
+
+        def build(previous):
+
+            kwargs = {}
+
+            if data_class is GoogleDoc:
+
+                kwargs = {
+                    "reference": load_reference()
+                }
+
+            if data_class is Ladder:
+
+                kwargs = {
+                    "league_id": name.partition(":")[2],
+                    "fetcher_options": {
+                        "bucket": self.load_ladder_bucket()
+                    }
+                }
+
+            data = data_class(
+                previous = previous,
+                **kwargs
+            )
+
+            if data_class is Ladder and not data.is_partial:
+
+                try:
+
+                    open_history(data.league_id).append(data)
+
+                except Exception as e:
+
+                    logging.error(
+                        e
+                    )
+
+            return data
+
+        def factory(previous):
+
+            data = shared_cache.get(
+                name,
+                data_class,
+                previous,
+                REFRESH_AFTER,
+                build
+            )
+
+            self.warm_join(name, data)
+
+            return data
+
+        return factory
+
+
+
+
+    def warm_join(self, name: str, data):
+
+        main_ladder = self.ladder_name(LADDER_LEAGUES[0])
+
+        if name not in ("google_doc", main_ladder):
+            return
+
+        google_doc = data if name == "google_doc" else self.get_slot("google_doc").value
+        ladder = data if name == main_ladder else self.get_slot(main_ladder).value
+
+        if google_doc is None or ladder is None:
+            return
+
+        prepare_join(google_doc, ladder)
+
+
+
+
+    def prepare_slot(self, name: str) -> DataSlot:
+
+        slot = self.get_slot(name)
+
+        if slot.factory is None:
+            slot.factory = self.make_factory(name)
+
+        if slot.value is None and not slot.is_refreshing:
+
+            snapshot = self.load_snapshot_store().load(name)
+
+            if snapshot is not None:
+                slot.value = self.get_data_class(name).from_snapshot(*snapshot)
+                self.warm_join(name, slot.value)
+
+        return slot
+
+
+
+
+    def load_data(self, name: str):
+
+        slot = self.prepare_slot(name)
+
+        instrumentation.record(
+            f"DataSlot.{name.partition(':')[0]}",
+            hit = slot.value is not None
         )
 
+        if slot.value is None and slot.failed_at is not None and time() - slot.failed_at < RETRY_AFTER:
+            raise slot.error
 
+        if slot.value is None:
 
-    def prepare_df_classes_frequency(self):
+            with st.spinner(self.spinners[name.partition(":")[0]]):
 
-        self.df_classes_frequency = self.df_origin.groupby(
-            [
-                "Подкласс"
-            ],
-            as_index = False
-        ).agg(
-            **{
-                "Количество игроков": (
-                    "Логин", "count"
-                ),
-                "Уникальных умений": (
-                    "Умение", "nunique"
+                slot.refresh(
+                    max_age = REFRESH_AFTER
                 )
-            }
-        ).sort_values(
-            [
-                "Количество игроков",
-                "Подкласс"
-            ],
-            ascending = [
-                False,
-                True
-            ]
-        )
-        self.df_classes_frequency["% игроков"] = self.df_classes_frequency["Количество игроков"]\
-        .div(self.nunique_players)\
-        .mul(100)\
-        .round(2)
 
+        return slot.value
 
 
 
-    def prepare_df_abilities_frequency(self):
 
-        self.df_abilities_frequency = self.df_origin.groupby(
-            [
-                "Умение"
-            ],
-            as_index = False
-        ).agg(
-            **{
-                "Количество игроков": (
-                    "Логин", "count"
-                ),
-                "Уникальных подклассов": (
-                    "Подкласс", "nunique"
-                )
-            }
-        ).sort_values(
-            [
-                "Количество игроков",
-                "Умение"
-            ],
-            ascending = [
-                False,
-                True
-            ]
-        )
-        self.df_abilities_frequency["% игроков"] = self.df_abilities_frequency["Количество игроков"]\
-        .div(self.nunique_players)\
-        .mul(100)\
-        .round(2)
+    @st.cache_resource
+    @staticmethod
+    def load_refresher(_self):
 
+        return Refresher(
+            _self.load_slots(),
+            refresh_after = REFRESH_AFTER,
+            retry_after = RETRY_AFTER
+        ).start()
 
 
 
-    def prepare_df_reroll_frequency(self):
 
-        ordered_values = {
-            "Без реролла": 0,
-            "Один реролл": 1,
-            "Два реролла": 2
-        }
+    @st.cache_resource
+    @staticmethod
+    def load_metrics_exporter(_self):
 
-        self.df_reroll_frequency = self.df_origin["Был реролл"]\
-        .value_counts()\
-        .to_frame()\
-        .reset_index()\
-        .rename(
-            columns = {
-                "count": "Количество игроков",
-                "Был реролл": "Количество рероллов"
-            }
-        ).sort_values(
-            [
-                "Количество рероллов"
-            ],
-            key = lambda x: x.map(ordered_values)
+        return MetricsExporter(
+            METRICS_PATHS
+        ).start()
+
+
+
+
+    def clear_cache(self):
+
+        for slot in self.load_slots().values():
+            slot.invalidate()
+
+        self.load_refresher().wake()
+
+
+
+
+    def make_adhoc_factory(self, league_id: str):
+
+        def factory(previous):
+
+            return Ladder(
+                previous = previous,
+                league_id = league_id,
+                fetcher_options = {
+                    "bucket": self.load_ladder_bucket()
+                }
+            )
+
+        return factory
+
+
+
+
+    def get_league_slot(self, league_id: str) -> DataSlot:
+
+        if league_id in LADDER_LEAGUES:
+            return self.prepare_slot(self.ladder_name(league_id))
+
+        return self.load_adhoc_slots().get(
+            league_id,
+            self.make_adhoc_factory(league_id)
         )
 
-        self.df_reroll_frequency["% игроков"] = self.df_reroll_frequency["Количество игроков"]\
-        .div(self.nunique_players)\
-        .mul(100)\
-        .round(2)
-    
 
 
 
-    def find_total_coins_for_bosses(self):
+    def load_leagues(self, league_ids: list) -> dict:
 
-        self.total_coins_for_bosses = self.df_coins_for_bosses["Сумма монет"].sum().astype(int)
+        slots = {
+            league_id: self.get_league_slot(league_id)
+            for league_id in league_ids
+        }
 
+        due = [
+            slot
+            for league_id, slot in slots.items()
+            if not slot.is_refreshing
+            and (slot.failed_at is None or time() - slot.failed_at >= RETRY_AFTER)
+            and (slot.value is None or league_id not in LADDER_LEAGUES and not slot.is_fresh(REFRESH_AFTER))
+        ]
 
+        for slot in due:
 
-    
-    def find_total_players_with_coins_for_bosses(self):
-
-        self.players_with_reward_for_bosses = self.df_origin[self.bosses_columns]\
-        .sum(axis = 1)\
-        .to_frame()\
-        .rename(
-            columns = {
-                0: "Сумма монет"
-            }
-        ).query(
-            "`Сумма монет` >= 10"
-        ).shape[0]
-        
+            if slot.value is not None:
 
+                Thread(
+                    target = self.refresh_quietly,
+                    args = (slot,),
+                    daemon = True
+                ).start()
 
-    
-    def prepare_df_coins_frequency(self):
-
-        self.df_coins_frequency = self.df_origin[self.bosses_columns]\
-        .sum(axis = 1)\
-        .value_counts()\
-        .to_frame()\
-        .reset_index()\
-        .rename(
-            columns = {
-                "index": "Сумма монет",
-                "count": "Количество игроков"
-            }
-        ).sort_values(
-            [
-                "Сумма монет"
-            ],
-            ascending = False
-        )     
+        missing = [
+            slot
+            for slot in due
+            if slot.value is None
+        ]
 
+        if missing:
 
-    
+            with st.spinner(self.spinners["ladder"]):
 
+                with ThreadPoolExecutor(len(missing)) as executor:
 
+                    for slot in missing:
+                        executor.submit(self.refresh_quietly, slot)
 
+        return {
+            league_id: slot.value
+            for league_id, slot in slots.items()
+        }
 
 
 
 
+    def refresh_quietly(self, slot: DataSlot):
 
-class Dashboard():
-    
+        try:
 
-    def __init__(self) -> None:
+            slot.refresh(REFRESH_AFTER)
 
-        self.google_doc: GoogleDoc = self.load_google_doc()
+        except Exception as e:
 
-        self.ladder: Ladder = self.load_ladder()
+            logging.error(
+                e
+            )
 
-    
 
 
-    @st.cache_resource(
-            ttl = TTL_TIME,
-            show_spinner = "Загружаю данные из Google Docs"
-    )
-    @staticmethod
-    def load_google_doc(_self):
 
-        data_class = GoogleDoc()
+    def draw_freshness(self, name: str, data):
 
-        return data_class
-    
+        slot = self.get_slot(name)
 
+        loaded_at = datetime.fromtimestamp(data.loaded_at).strftime("%d.%m.%Y %H:%M")
 
-    @st.cache_resource(
-            ttl = TTL_TIME,
-            show_spinner = "Загружаю данные из ладдера"
-    )
-    @staticmethod
-    def load_ladder(_self):
+        minutes = int((time() - data.loaded_at) // 60)
 
-        data_class = Ladder()
+        status = [
+            f"Данные от {loaded_at} ({minutes} мин назад)"
+        ]
 
-        return data_class
+        if data.source == "snapshot":
+            status.append("из сохранённого снимка")
 
+        if data.source == "shared":
+            status.append("из общего кэша")
 
+        if getattr(data, "is_partial", False):
+            status.append(
+                f"неполные данные: {len(data.df_origin)} из {data.expected_total or '?'} персонажей, догружаются"
+            )
 
+        if getattr(data, "is_approximate", False):
+            status.append(
+                f"ниже {data.verified_rows}-го места данные из прошлых обновлений, полный обход раз в {data.full_sync_every} обновлений"
+            )
 
-    def clear_cache(self):
+        if slot.is_refreshing:
+            status.append("идёт обновление")
 
-        self.load_google_doc.clear()
+        if slot.error is not None:
+            status.append("последнее обновление не удалось")
 
-        self.load_ladder.clear()
+        st.caption(
+            " · ".join(status)
+        )
 
 
 
 
+    @st.fragment
+    @timed
     def draw_head_google_doc(self):
 
         columns = st.columns(
@@ -396,6 +476,8 @@ class Dashboard():
                 "**Дата завершения** 24.09.2024"
             )
 
+        self.draw_freshness("google_doc", self.google_doc)
+
         st.divider()
 
 
@@ -439,9 +521,11 @@ class Dashboard():
 
 
 
+    @st.fragment
+    @timed
     def draw_combination_frequency_google_doc(self):
 
-        df = self.google_doc.df_combination_frequency
+        df = self.google_doc.arrow("df_combination_frequency")
 
         st.header(
             "Частота комбинаций"
@@ -453,7 +537,7 @@ class Dashboard():
 
             selected_class = st.multiselect(
                 "Подкласс",
-                options = st.session_state["classes"],
+                options = self.reference.classes,
                 key = "Частота комбинаций подкласс"
             )
         
@@ -461,21 +545,24 @@ class Dashboard():
 
             selected_ability = st.multiselect(
                 "Умение",
-                options = st.session_state["abilities"],
+                options = self.reference.abilities,
                 key = "Частота комбинаций умение"
             )
 
-        if selected_class:
-            
-            df = df[
-                df["Подкласс"].isin(selected_class)
-            ]
-        
-        if selected_ability:
-
-            df = df[
-                df["Умение"].isin(selected_ability)
-            ]
+        if selected_class or selected_ability:
+
+            df = self.view_cache.get(
+                self.google_doc.content_hash,
+                "combination_frequency",
+                normalize_selection(selected_class, selected_ability),
+                lambda: self.google_doc.arrow(
+                    "df_combination_frequency",
+                    {
+                        "Подкласс": selected_class,
+                        "Умение": selected_ability
+                    }
+                )
+            )
 
         st.dataframe(
             df,
@@ -486,9 +573,11 @@ class Dashboard():
 
 
     
+    @st.fragment
+    @timed
     def draw_coins_for_bosses_google_doc(self):
 
-        df = self.google_doc.df_coins_for_bosses
+        df = self.google_doc.arrow("df_coins_for_bosses")
 
         st.header(
             "Сумма монет по боссам"
@@ -500,10 +589,18 @@ class Dashboard():
         )
 
         if selected_boss:
-            
-            df = df[
-                df["Имя босса"].isin(selected_boss)
-            ]
+
+            df = self.view_cache.get(
+                self.google_doc.content_hash,
+                "coins_for_bosses",
+                normalize_selection(selected_boss),
+                lambda: self.google_doc.arrow(
+                    "df_coins_for_bosses",
+                    {
+                        "Имя босса": selected_boss
+                    }
+                )
+            )
 
         st.dataframe(
             df,
@@ -514,26 +611,36 @@ class Dashboard():
 
 
 
+    @st.fragment
+    @timed
     def draw_classes_frequency_google_doc(self):
 
         st.header(
             "Частота подклассов"
         )
 
-        df = self.google_doc.df_classes_frequency
+        df = self.google_doc.arrow("df_classes_frequency")
 
 
         selected_classes = st.multiselect(
             "Подкласс",
-            options = st.session_state["classes"],
+            options = self.reference.classes,
             key = "Частота подклассов"
         )
 
         if selected_classes:
-            
-            df = df[
-                df["Подкласс"].isin(selected_classes)
-            ]
+
+            df = self.view_cache.get(
+                self.google_doc.content_hash,
+                "classes_frequency",
+                normalize_selection(selected_classes),
+                lambda: self.google_doc.arrow(
+                    "df_classes_frequency",
+                    {
+                        "Подкласс": selected_classes
+                    }
+                )
+            )
 
         st.dataframe(
             df,
@@ -544,26 +651,36 @@ class Dashboard():
 
 
 
+    @st.fragment
+    @timed
     def draw_abilities_frequency_google_doc(self):
 
         st.header(
             "Частота умений"
         )
 
-        df = self.google_doc.df_abilities_frequency
+        df = self.google_doc.arrow("df_abilities_frequency")
 
 
         selected_abilities = st.multiselect(
             "Умение",
-            options = st.session_state["abilities"],
+            options = self.reference.abilities,
             key = "Частота умений"
         )
 
         if selected_abilities:
-            
-            df = df[
-                df["Умение"].isin(selected_abilities)
-            ]
+
+            df = self.view_cache.get(
+                self.google_doc.content_hash,
+                "abilities_frequency",
+                normalize_selection(selected_abilities),
+                lambda: self.google_doc.arrow(
+                    "df_abilities_frequency",
+                    {
+                        "Умение": selected_abilities
+                    }
+                )
+            )
 
         st.dataframe(
             df,
@@ -574,6 +691,8 @@ class Dashboard():
 
     
 
+    @st.fragment
+    @timed
     def draw_reroll_frequency_google_doc(self):
 
         st.header(
@@ -581,7 +700,7 @@ class Dashboard():
         )
 
         st.dataframe(
-            self.google_doc.df_reroll_frequency,
+            self.google_doc.arrow("df_reroll_frequency"),
             hide_index = True,
             use_container_width = True
         )
@@ -589,20 +708,92 @@ class Dashboard():
 
 
 
+    @st.fragment
+    @timed
     def draw_coins_frequency(self):
 
         st.header(
             "Частота сумм монет за боссов"
         )
 
+        aggregates = self.google_doc.aggregates
+
+        threshold = st.slider(
+            "Порог монет",
+            min_value = 0,
+            max_value = max(int(aggregates.coins_percentile(100)), self.google_doc.reward_threshold),
+            value = self.google_doc.reward_threshold,
+            key = "Порог монет"
+        )
+
+        players = aggregates.count_players_with_coins(threshold)
+
+        columns = st.columns(2)
+
+        with columns[0]:
+
+            st.metric(
+                f"Игроков с {threshold}+ монетами",
+                players
+            )
+
+        with columns[1]:
+
+            st.metric(
+                "Доля игроков",
+                f"{players / max(aggregates.total_rows, 1):.1%}"
+            )
+
+        st.caption(
+            f"Медиана: {aggregates.coins_percentile(50):g} · 90-й перцентиль: {aggregates.coins_percentile(90):g}"
+        )
+
         st.dataframe(
-            self.google_doc.df_coins_frequency,
+            self.google_doc.arrow("df_coins_frequency"),
             use_container_width = True,
             hide_index = True
         )
 
 
 
+
+    @timed
+    def draw_view_cache_stats(self):
+
+        panels = {
+            "combination_frequency": "комбинации",
+            "coins_for_bosses": "боссы",
+            "classes_frequency": "подклассы",
+            "abilities_frequency": "умения"
+        }
+
+        details = ", ".join(
+            f"{label} {self.view_cache.hit_rate(panel):.0%}"
+            for panel, label in panels.items()
+        )
+
+        st.caption(
+            f"Кэш фильтров: {self.view_cache.hit_rate():.0%} попаданий ({details})"
+        )
+
+
+
+    @timed
+    def draw_ladder_unavailable(self):
+
+        st.title(
+            "Файл ладдера с сайта"
+        )
+
+        st.warning(
+            "Ладдер сейчас недоступен, попробую загрузить его снова через минуту"
+        )
+
+
+
+
+    @st.fragment
+    @timed
     def draw_ladder_headers(self):
 
         st.title(
@@ -640,14 +831,18 @@ class Dashboard():
 
             st.link_button(
                 "Ладдер",
-                "https://ru.pathofexile.com/ladders/league/PoE%20Chudes%20SoK%20by%20Cardiff%20(PL49476)"
+                self.ladder.url
             )
+
+        self.draw_freshness(self.ladder_name(self.league_id), self.ladder)
         
         st.divider()
 
 
 
 
+    @st.fragment
+    @timed
     def draw_classes_info_ladder(self):
 
         st.header(
@@ -655,7 +850,7 @@ class Dashboard():
         )
 
         st.dataframe(
-            self.ladder.df_classes_frequency,
+            self.ladder.arrow("df_classes_frequency"),
             use_container_width = True,
             hide_index = True
         )
@@ -663,6 +858,8 @@ class Dashboard():
 
 
 
+    @st.fragment
+    @timed
     def draw_level_frequency_ladder(self):
 
         st.header(
@@ -670,7 +867,7 @@ class Dashboard():
         )
 
         st.dataframe(
-            self.ladder.df_level_frequency,
+            self.ladder.arrow("df_level_frequency"),
             use_container_width = True,
             hide_index = True
         )
@@ -678,6 +875,8 @@ class Dashboard():
 
 
 
+    @st.fragment
+    @timed
     def draw_character_per_account_ladder(self):
 
         st.header(
@@ -685,7 +884,7 @@ class Dashboard():
         )
         
         st.dataframe(
-            self.ladder.df_character_per_account,
+            self.ladder.arrow("df_character_per_account"),
             hide_index = True,
             use_container_width = True
         )
@@ -693,6 +892,8 @@ class Dashboard():
 
 
 
+    @st.fragment
+    @timed
     def draw_challenges_dist_ladder(self):
 
         st.header(
@@ -700,7 +901,7 @@ class Dashboard():
         )
 
         st.dataframe(
-            self.ladder.df_challenges_frequency,
+            self.ladder.arrow("df_challenges_frequency"),
             use_container_width = True,
             hide_index = True
         )
@@ -708,229 +909,450 @@ class Dashboard():
 
 
 
+    @st.fragment
+    @timed
+    def draw_history_ladder(self):
 
+        st.header(
+            "Динамика ивента"
+        )
 
+        history = open_history(self.league_id).current_view()
 
+        if history.refreshes < 2:
 
-class Ladder():
+            st.caption(
+                f"История копится: сохранено обновлений ладдера — {history.refreshes}"
+            )
 
-    def __init__(self) -> None:
-        
-        self.load_data()
-        self.prepare_main_metrics()
-        self.prepare_df_classes_frequency()
-        self.prepare_df_level_frequency()
-        self.prepare_df_challenges_frequency()
-        self.prepare_df_character_per_account()
-    
+            return
 
+        st.caption(
+            f"Обновлений ладдера в истории: {history.refreshes}"
+        )
 
+        columns = st.columns(2)
 
-    def load_data(self):
+        with columns[0]:
 
-        offset = 0
+            st.subheader(
+                "Средний уровень по подклассам"
+            )
 
-        raw_data = []
+            st.line_chart(
+                history.df_class_level_trend
+            )
 
-        while True:
-            
-            link = f"https://ru.pathofexile.com/api/ladders?offset={offset}&limit=200&id=PoE%20Chudes%20SoK%20by%20Cardiff%20(PL49476)&realm=pc&_=1694455499930"
+        with columns[1]:
 
-            request = requests.get(
-                link,
-                headers = {
-                    "User-Agent": "Opera"
-                }
-            ).json()["entries"]
+            st.subheader(
+                "% мёртвых персонажей по подклассам"
+            )
 
-            for record in request:
+            st.line_chart(
+                history.df_class_death_trend
+            )
 
-                character_rank = record.get("rank")
+        columns = st.columns(2)
 
-                is_dead = record.get("dead")
+        with columns[0]:
 
-                is_public = record.get("public")
+            st.subheader(
+                "Больше всего уровней за ивент"
+            )
 
-                character = record.get("character")
+            st.dataframe(
+                history.arrow("df_level_gain"),
+                use_container_width = True,
+                hide_index = True
+            )
 
-                character_id = character.get("id")
+        with columns[1]:
 
-                character_name = character.get("name")
-                
-                character_level = character.get("level")
+            st.subheader(
+                "Больше всего поднялись в рейтинге"
+            )
 
-                character_class = character.get("class")
-                
-                character_depth_solo = None
-                if "depth" in character.keys():
+            st.dataframe(
+                history.arrow("df_rank_climb"),
+                use_container_width = True,
+                hide_index = True
+            )
 
-                    character_depth_solo = character.get("depth").get("solo")
 
-                account = record.get("account")
 
-                account_name = account.get("name")
 
-                challenges = account.get("challenges").get("completed")
+    @st.fragment
+    @timed
+    def draw_sheet_ladder_join(self):
 
-                raw_data.append(
-                    [
-                        character_rank,
-                        is_dead,
-                        is_public,
-                        account_name,
-                        character_id,
-                        character_name,
-                        character_level,
-                        character_class,
-                        character_depth_solo,
-                        challenges
-                    ]
+        st.header(
+            "Приватка и ладдер"
+        )
+
+        if not self.join.is_warm:
+
+            st.caption(
+                "Сопоставляю приватку с ладдером, данные появятся после обновления страницы"
+            )
+
+            return
+
+        columns = st.columns(3)
+
+        with columns[0]:
+
+            st.metric(
+                "Нашлись в ладдере",
+                self.join.matched_players
+            )
+
+        with columns[1]:
+
+            st.metric(
+                "Нет в ладдере",
+                len(self.join.df_unmatched_sheet)
+            )
+
+        with columns[2]:
+
+            st.metric(
+                "Другой подкласс",
+                len(self.join.df_class_mismatch)
+            )
+
+        tabs = st.tabs(
+            [
+                "Нет в ладдере",
+                "Нет в приватке",
+                "Другой подкласс"
+            ]
+        )
+
+        for tab, name in zip(
+            tabs,
+            [
+                "df_unmatched_sheet",
+                "df_unmatched_ladder",
+                "df_class_mismatch"
+            ]
+        ):
+
+            with tab:
+
+                st.dataframe(
+                    self.join.arrow(name),
+                    use_container_width = True,
+                    hide_index = True
                 )
-            
-            if len(request) == 200:
 
-                offset += 200
 
-                sleep(2)
 
-                continue
-            else:
-                break
-            
-        
-        self.df_origin = pd.DataFrame(
-            columns = [
-                "rank",
-                "is_dead",
-                "is_public",
-                "account",
-                "character_id",
-                "character_name",
-                "character_level",
-                "character_class",
-                "solo_depth",
-                "challenges"  
-            ],
-            data = raw_data
+
+    @st.fragment
+    @timed
+    def draw_player_search(self):
+
+        st.header(
+            "Поиск игрока"
         )
 
+        suggestions = st.session_state.get("Подсказки игрока", {})
+        query = st.session_state.get("Поиск игрока")
 
+        if query is not None and query not in suggestions:
+            suggestions = st.session_state["Подсказки игрока"] = self.player_suggestions(query)
 
+        selected = st.selectbox(
+            "Логин, аккаунт или персонаж",
+            options = list(suggestions),
+            index = None,
+            placeholder = "Введите имя и нажмите Enter, затем выберите из подсказок",
+            accept_new_options = True,
+            key = "Поиск игрока"
+        )
 
-    def prepare_main_metrics(self):
+        if selected is None:
+            return
 
-        self.total_characters = self.df_origin.shape[0]
+        player = suggestions.get(selected)
 
-        self.nunique_players = self.df_origin["account"].nunique()
+        if player is None:
 
-        self.max_depth_solo = self.df_origin["solo_depth"].max().astype(int)
+            st.caption(
+                "Никого не нашлось"
+            )
 
+            return
 
+        self.draw_player_card(player)
 
 
-    def prepare_df_classes_frequency(self):
 
-        self.df_classes_frequency = self.df_origin.groupby(
-            [
-                "character_class"
-            ],
-            as_index = False
-        ).agg(
-            **{
-                "Количество персонажей": (
-                    "character_class", "count"
-                ),
 
-                "Минимальный уровень": (
-                    "character_level", "min"
-                ),
+    def player_suggestions(self, query: str) -> dict:
 
-                "Средний уровень": (
-                    "character_level", "mean"
-                ),
+        suggestions = {
+            f"{name} · приватка": name
+            for name in self.google_doc.login_index.search(query, SEARCH_LIMIT)
+        }
 
-                "Максимальный уровень": (
-                    "character_level", "max"
-                )
-            }
-        ).sort_values(
-            [
-                "Количество персонажей"
-            ],
-            ascending = False
-        ).rename(
-            columns = {
-                "character_class": "Подкласс"
-            }
-        )
+        if self.ladder is not None:
 
-        self.df_classes_frequency["Средний уровень"] = self.df_classes_frequency["Средний уровень"].round(1)
-        
-    
+            suggestions.update(
+                {
+                    f"{name} · аккаунт": name
+                    for name in self.ladder.account_index.search(query, SEARCH_LIMIT)
+                }
+            )
+            suggestions.update(
+                {
+                    f"{name} · персонаж": self.ladder.character_account(name)
+                    for name in self.ladder.character_index.search(query, SEARCH_LIMIT)
+                }
+            )
+
+        return {
+            query: next(iter(suggestions.values()), None),
+            **suggestions
+        }
 
 
-    def prepare_df_challenges_frequency(self):
 
-        self.df_challenges_frequency = self.df_origin["challenges"]\
-        .value_counts()\
-        .to_frame()\
-        .reset_index()\
-        .rename(
-            columns = {
-                "challenges": "Количество испытаний",
-                "count": "Количество игроков"
-            }
-        ).sort_values(
-            [
-                "Количество испытаний"
-            ],
-            ascending = False
+
+    def draw_player_card(self, player: str):
+
+        rows = self.google_doc.player_rows(player)
+
+        st.subheader(
+            player
         )
 
+        columns = st.columns(2)
 
+        with columns[0]:
 
-    
-    def prepare_df_level_frequency(self):
-
-        self.df_level_frequency = self.df_origin["character_level"]\
-        .value_counts()\
-        .to_frame()\
-        .reset_index()\
-        .rename(
-            columns = {
-                "character_level": "Уровень персонажа",
-                "count": "Количество персонажей"
-            }
-        ).sort_values(
-            [
-                "Уровень персонажа",
-            ],
-            ascending = False
+            if rows.empty:
+
+                st.caption(
+                    "В приватке не записан"
+                )
+
+            for _, row in rows.iterrows():
+
+                st.write(
+                    f"**{row['Подкласс']}** · {row['Умение']} · {row['Был реролл']}"
+                )
+
+                coins = row[self.google_doc.bosses_columns].dropna()
+
+                st.metric(
+                    "Монет за боссов",
+                    f"{coins.sum():g}"
+                )
+
+                st.dataframe(
+                    coins.rename_axis(
+                        "Имя босса"
+                    ).reset_index(
+                        name = "Монеты"
+                    ),
+                    use_container_width = True,
+                    hide_index = True
+                )
+
+        with columns[1]:
+
+            characters = self.ladder.account_characters(player) if self.ladder is not None else None
+
+            if characters is None or characters.empty:
+
+                st.caption(
+                    "В ладдере не найден"
+                )
+
+                return
+
+            st.dataframe(
+                characters.reindex(
+                    columns = [
+                        "character_name",
+                        "character_class",
+                        "character_level",
+                        "rank",
+                        "is_dead",
+                        "challenges",
+                        "solo_depth"
+                    ]
+                ).dropna(
+                    axis = 1,
+                    how = "all"
+                ).rename(
+                    columns = {
+                        "character_name": "Персонаж",
+                        "character_class": "Подкласс",
+                        "character_level": "Уровень",
+                        "rank": "Место",
+                        "is_dead": "Погиб",
+                        "challenges": "Испытания",
+                        "solo_depth": "Глубина соло"
+                    }
+                ),
+                use_container_width = True,
+                hide_index = True
+            )
+
+
+
+
+    @st.fragment
+    @timed
+    def draw_league_comparison(self):
+
+        st.header(
+            "Сравнение лиг"
+        )
+
+        league_ids = st.multiselect(
+            "Лиги",
+            options = LADDER_LEAGUES,
+            default = [self.league_id],
+            max_selections = MAX_COMPARED_LEAGUES,
+            accept_new_options = True,
+            key = "Сравнение лиг"
         )
 
+        if len(league_ids) < 2:
+
+            st.caption(
+                "Выберите или впишите id ещё хотя бы одной лиги"
+            )
+
+            return
+
+        ladders = self.load_leagues(league_ids)
+
+        failed = [
+            league_id
+            for league_id, ladder in ladders.items()
+            if ladder is None
+        ]
+
+        if failed:
+
+            st.warning(
+                f"Не удалось загрузить: {', '.join(failed)}"
+            )
+
+        ladders = {
+            league_id: ladder
+            for league_id, ladder in ladders.items()
+            if ladder is not None
+        }
 
+        if len(ladders) < 2:
+            return
 
+        comparison = LeagueComparison(ladders)
 
-    def prepare_df_character_per_account(self):
+        columns = st.columns(3)
 
-        self.df_character_per_account = self.df_origin["account"]\
-        .value_counts()\
-        .value_counts()\
-        .to_frame()\
-        .rename(
-            columns = {
-                "count": "Количество игроков"
-            }
-        ).reset_index()\
-        .rename(
-            columns = {
-                "count": "Количество персонажей на аккаунт"
-            }
-        ).sort_values(
+        for column, (title, df) in zip(
+            columns,
             [
-                "Количество персонажей на аккаунт"
+                ("Подклассы, % персонажей", comparison.df_classes_share),
+                ("Уровни, % персонажей", comparison.df_level_share),
+                ("Испытания, % персонажей", comparison.df_challenges_share)
             ]
-        )
+        ):
+
+            with column:
+
+                st.subheader(
+                    title
+                )
+
+                st.dataframe(
+                    df,
+                    use_container_width = True,
+                    hide_index = True
+                )
+
+
+
+
+    @timed
+    def draw_memory_report(self):
+
+        with st.expander("Память"):
+
+            for name, slot in list(self.load_slots().items()):
 
+                if slot.value is None:
+                    continue
 
+                df = memory_report(slot.value)
 
+                st.caption(
+                    f"{name}: {df['Байт'].sum() / 2 ** 20:.1f} МиБ"
+                )
+
+                st.dataframe(
+                    df,
+                    hide_index = True,
+                    use_container_width = True
+                )
+
+
+
+
+    @timed
+    def draw_diagnostics(self):
+
+        with st.expander("Диагностика", expanded = True):
+
+            df = pd.DataFrame.from_dict(
+                instrumentation.snapshot(),
+                orient = "index"
+            ).rename_axis(
+                "Этап"
+            ).reset_index()
+
+            if df.empty:
+
+                st.caption(
+                    "Замеров пока нет"
+                )
+
+                return
+
+            df["updated_at"] = pd.to_datetime(df["updated_at"], unit = "s")
+
+            st.dataframe(
+                df.sort_values(
+                    "seconds",
+                    ascending = False
+                ),
+                hide_index = True,
+                use_container_width = True
+            )
+
+            columns = st.columns(2)
+
+            with columns[0]:
+
+                st.download_button(
+                    "metrics.json",
+                    instrumentation.to_json(),
+                    file_name = "metrics.json",
+                    mime = "application/json"
+                )
+
+            with columns[1]:
+
+                st.download_button(
+                    "metrics.prom",
+                    instrumentation.to_prometheus(),
+                    file_name = "metrics.prom",
+                    mime = "text/plain"
+                )
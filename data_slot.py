@@ -0,0 +1,216 @@
+import logging
+from collections import OrderedDict
+from threading import Event, Lock, Thread
+from time import time
+
+
+
+
+class DataSlot():
+
+    def __init__(self) -> None:
+
+        self.value = None
+        self.factory = None
+        self.stale = False
+
+        self.error = None
+        self.failed_at = None
+        self.last_duration = None
+
+        self.refresh_lock = Lock()
+
+
+
+
+    @property
+    def age(self) -> float:
+
+        if self.value is None or self.stale:
+            return float("inf")
+
+        return time() - self.value.loaded_at
+
+
+
+
+    def is_fresh(self, max_age: float) -> bool:
+
+        if self.value is None or self.value.source == "snapshot" or getattr(self.value, "is_partial", False):
+            return False
+
+        return self.age < max_age
+
+
+
+
+    def invalidate(self):
+
+        self.stale = True
+
+
+
+
+    @property
+    def is_refreshing(self) -> bool:
+
+        return self.refresh_lock.locked()
+
+
+
+
+    def refresh(self, max_age: float = 0, warm: bool = False):
+
+        with self.refresh_lock:
+
+            if self.is_fresh(max_age):
+                return self.value
+
+            started_at = time()
+
+            try:
+
+                value = self.factory(self.value)
+
+                if warm:
+                    value.compute_all()
+
+                self.value = value
+
+                self.stale = False
+                self.error = None
+                self.failed_at = None
+
+            except Exception as e:
+
+                self.error = e
+                self.failed_at = time()
+
+                raise
+
+            finally:
+
+                self.last_duration = time() - started_at
+
+        return self.value
+
+
+
+
+
+
+
+
+class SlotCache():
+
+    def __init__(self, max_size: int) -> None:
+
+        self.max_size = max_size
+
+        self.slots = OrderedDict()
+
+        self.lock = Lock()
+
+
+
+
+    def get(self, name: str, factory) -> DataSlot:
+
+        with self.lock:
+
+            slot = self.slots.get(name)
+
+            if slot is None:
+
+                slot = self.slots[name] = DataSlot()
+                slot.factory = factory
+
+            self.slots.move_to_end(name)
+
+            while len(self.slots) > self.max_size:
+                self.slots.popitem(last = False)
+
+            return slot
+
+
+
+
+
+
+
+
+class Refresher():
+
+    def __init__(self, slots: dict, refresh_after: float, interval: float = 30, retry_after: float = 60) -> None:
+
+        self.slots = slots
+        self.refresh_after = refresh_after
+        self.interval = interval
+        self.retry_after = retry_after
+
+        self.wakeup = Event()
+
+        self.thread = Thread(
+            target = self.run,
+            daemon = True
+        )
+
+
+
+
+    def start(self) -> "Refresher":
+
+        self.thread.start()
+
+        return self
+
+
+
+
+    def wake(self):
+
+        self.wakeup.set()
+
+
+
+
+    def is_due(self, slot: DataSlot) -> bool:
+
+        if slot.factory is None or slot.value is None or slot.is_refreshing:
+            return False
+
+        if slot.failed_at is not None and time() - slot.failed_at < self.retry_after:
+            return False
+
+        return not slot.is_fresh(self.refresh_after)
+
+
+
+
+    def run(self):
+
+        while True:
+
+            for name, slot in list(self.slots.items()):
+
+                if not self.is_due(slot):
+                    continue
+
+                try:
+
+                    slot.refresh(self.refresh_after, warm = True)
+
+                    logging.info(
+                        "refreshed %s in %.1fs",
+                        name,
+                        slot.last_duration
+                    )
+
+                except Exception as e:
+
+                    logging.error(
+                        e
+                    )
+
+            self.wakeup.wait(self.interval)
+            self.wakeup.clear()
@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
 from dashboard_classes import Dashboard
-from secondary_defs import init_main_states
 import logging
 
 st.set_page_config(
@@ -10,7 +9,6 @@ st.set_page_config(
 
 st.write("#")
 
-init_main_states()
 try:
     dashboard = Dashboard()
 
@@ -37,21 +35,46 @@ try:
     with columns[1]:
         dashboard.draw_coins_frequency()
 
+    dashboard.draw_view_cache_stats()
+
     st.divider()
 
-    dashboard.draw_ladder_headers()
+    if dashboard.ladder is None:
+        dashboard.draw_ladder_unavailable()
+    else:
+        dashboard.draw_ladder_headers()
 
-    columns = st.columns([2, 1])
-    with columns[0]:
-        dashboard.draw_classes_info_ladder()
-    with columns[1]:
-        dashboard.draw_level_frequency_ladder()
+        columns = st.columns([2, 1])
+        with columns[0]:
+            dashboard.draw_classes_info_ladder()
+        with columns[1]:
+            dashboard.draw_level_frequency_ladder()
 
-    columns = st.columns(2)
-    with columns[0]:
-        dashboard.draw_character_per_account_ladder()
-    with columns[1]:
-        dashboard.draw_challenges_dist_ladder()
+        columns = st.columns(2)
+        with columns[0]:
+            dashboard.draw_character_per_account_ladder()
+        with columns[1]:
+            dashboard.draw_challenges_dist_ladder()
+
+        st.divider()
+
+        dashboard.draw_history_ladder()
+
+        st.divider()
+
+        dashboard.draw_sheet_ladder_join()
+
+    st.divider()
+
+    dashboard.draw_player_search()
+
+    st.divider()
+
+    dashboard.draw_league_comparison()
+
+    if st.query_params.get("diagnostics"):
+        dashboard.draw_memory_report()
+        dashboard.draw_diagnostics()
 
 
 
@@ -0,0 +1,37 @@
+import pytest
+
+from analytics import ladder_fetcher
+from analytics.ladder_fetcher import LADDER_PAGE_SIZE
+from benchmarks.synthetic import make_ladder_entries
+
+
+CHARACTERS = 1050
+
+
+
+
+@pytest.fixture
+def server(monkeypatch):
+
+    state = {
+        "entries": make_ladder_entries(CHARACTERS),
+        "requests": [],
+        "failing": set()
+    }
+
+    def fetch_page(self, offset):
+
+        state["requests"].append(offset)
+
+        if offset in state["failing"]:
+            raise ConnectionError(f"offset {offset} is down")
+
+        return {
+            "total": len(state["entries"]),
+            "entries": state["entries"][offset:offset + LADDER_PAGE_SIZE]
+        }
+
+    monkeypatch.setattr(ladder_fetcher.LadderFetcher, "fetch_page", fetch_page)
+    monkeypatch.setattr(ladder_fetcher.TokenBucket, "acquire", lambda self: None)
+
+    return state
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from types import SimpleNamespace
+
+import pytest
+
+from analytics import ladder_fetcher
+from analytics.ladder import Ladder
+from analytics.ladder_checkpoint import LadderCheckpoint
+from analytics.ladder_fetcher import LADDER_MAX_BACKOFF, LADDER_PAGE_SIZE, LadderFetcher, TokenBucket
+
+
+BACKOFF = 1.0
+
+
+
+
+def error(retry_after: "str | None") -> Exception:
+
+    e = Exception("429")
+    e.response = SimpleNamespace(
+        headers = {} if retry_after is None else {"Retry-After": retry_after}
+    )
+
+    return e
+
+
+
+
+@pytest.fixture
+def fetcher() -> LadderFetcher:
+
+    return LadderFetcher(
+        "league",
+        backoff = BACKOFF
+    )
+
+
+
+
+def test_retry_delay_reads_seconds(fetcher):
+
+    assert fetcher.retry_delay(error("7"), 0) == 7.0
+
+
+
+
+def test_retry_delay_reads_http_date(fetcher):
+
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds = 30)
+
+    assert 25 <= fetcher.retry_delay(error(format_datetime(retry_at)), 0) <= 30
+
+
+
+
+@pytest.mark.parametrize("retry_after", [None, "soon", "Mon, 99 Foo 2026", "1.5s"])
+def test_retry_delay_falls_back_to_backoff(fetcher, retry_after):
+
+    delay = fetcher.retry_delay(error(retry_after), 2)
+
+    assert BACKOFF * 4 <= delay <= min(BACKOFF * 5, LADDER_MAX_BACKOFF)
+
+
+
+
+def test_pause_is_not_shortened_by_time_since_the_last_acquire(monkeypatch):
+
+    clock = [100.0]
+
+    monkeypatch.setattr(ladder_fetcher, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(ladder_fetcher, "sleep", lambda seconds: clock.__setitem__(0, clock[0] + seconds))
+
+    bucket = TokenBucket(1.0)
+    bucket.acquire()
+
+    clock[0] += 3
+    bucket.pause(3)
+
+    bucket.acquire()
+
+    assert clock[0] >= 106
+
+
+
+
+def test_failed_crawl_saves_a_checkpoint_and_the_next_load_resumes(server, tmp_path):
+
+    failed_at = LADDER_PAGE_SIZE * 3
+
+    server["failing"].add(failed_at)
+
+    partial = Ladder(
+        fetcher_options = {"max_workers": 1},
+        checkpoint_dir = str(tmp_path)
+    )
+
+    checkpoint = LadderCheckpoint(partial.league_id, str(tmp_path))
+
+    assert partial.is_partial
+    assert len(partial.df_origin) == failed_at
+    assert checkpoint.load() is not None
+    assert checkpoint.next_offset == failed_at
+
+    server["failing"].clear()
+    server["requests"].clear()
+
+    ladder = Ladder(
+        previous = partial,
+        fetcher_options = {"max_workers": 1},
+        checkpoint_dir = str(tmp_path)
+    )
+
+    assert server["requests"] == list(range(failed_at, len(server["entries"]), LADDER_PAGE_SIZE))
+    assert not ladder.is_partial
+    assert list(ladder.df_origin["character_id"]) == [entry["character"]["id"] for entry in server["entries"]]
+    assert LadderCheckpoint(partial.league_id, str(tmp_path)).load() is None
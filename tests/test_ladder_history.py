@@ -0,0 +1,133 @@
+import os
+from time import time
+
+import pandas as pd
+import pytest
+
+from analytics.ladder import Ladder
+from analytics.ladder_columns import LadderColumns
+from analytics.ladder_history import LadderHistory
+from analytics.snapshot_store import SnapshotStore
+from benchmarks.synthetic import make_ladder_entries
+
+
+CHARACTERS = 300
+
+LEAGUE_ID = "league"
+
+
+
+
+def snapshot(entries: list, loaded_at: float) -> Ladder:
+
+    return Ladder.from_snapshot(
+        LadderColumns.from_page(entries).to_frame(),
+        {
+            "loaded_at": loaded_at,
+            "league_id": LEAGUE_ID,
+            "syncs_since_full": 0
+        }
+    )
+
+
+
+
+def refreshes(count: int) -> list:
+
+    entries = make_ladder_entries(CHARACTERS)
+    started_at = time()
+    ladders = []
+
+    for step in range(count):
+
+        for entry in entries[step::7]:
+            entry["character"]["level"] += 1
+
+        ladders.append(
+            snapshot(entries, started_at + step)
+        )
+
+    return ladders
+
+
+
+
+def crash_on_save(monkeypatch, crashed_name: str):
+
+    save = SnapshotStore.save
+
+    def failing_save(self, name, *args, **kwargs):
+
+        if name == crashed_name:
+            raise OSError("disk went away")
+
+        return save(self, name, *args, **kwargs)
+
+    monkeypatch.setattr(SnapshotStore, "save", failing_save)
+
+
+
+
+def assert_same_history(history: LadderHistory, expected: LadderHistory):
+
+    assert history.seq == expected.seq
+
+    pd.testing.assert_frame_equal(
+        history.state.sort_index(),
+        expected.state.sort_index()
+    )
+    pd.testing.assert_frame_equal(
+        history.class_trend.reset_index(drop = True),
+        expected.class_trend.reset_index(drop = True),
+        check_dtype = False
+    )
+
+
+
+
+@pytest.mark.parametrize("crashed_name", ["class_trend", "state"])
+@pytest.mark.parametrize("crashed_append", [0, 1])
+def test_crash_while_saving_keeps_the_trend(tmp_path, monkeypatch, crashed_append, crashed_name):
+
+    ladders = refreshes(3)
+
+    expected = LadderHistory(LEAGUE_ID, str(tmp_path / "expected"))
+
+    for ladder in ladders:
+        expected.append(ladder)
+
+    history = LadderHistory(LEAGUE_ID, str(tmp_path / "crashed"))
+
+    for ladder in ladders[:crashed_append]:
+        history.append(ladder)
+
+    with monkeypatch.context() as patch:
+
+        crash_on_save(patch, crashed_name)
+
+        with pytest.raises(OSError):
+            history.append(ladders[crashed_append])
+
+    history = LadderHistory(LEAGUE_ID, str(tmp_path / "crashed"))
+
+    for ladder in ladders[crashed_append + 1:]:
+        history.append(ladder)
+
+    assert_same_history(history, expected)
+
+
+
+
+def test_load_rebuilds_a_missing_class_trend(tmp_path):
+
+    history = LadderHistory(LEAGUE_ID, str(tmp_path))
+
+    for ladder in refreshes(2):
+        history.append(ladder)
+
+    os.remove(os.path.join(history.directory, "class_trend.arrow"))
+
+    reloaded = LadderHistory(LEAGUE_ID, str(tmp_path))
+
+    assert reloaded.seq == history.seq
+    assert set(reloaded.class_trend["recorded_at"]) == {history.recorded_at}
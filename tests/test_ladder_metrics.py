@@ -0,0 +1,52 @@
+from time import time
+
+from analytics.ladder import Ladder
+from analytics.ladder_columns import LadderColumns
+from benchmarks.synthetic import make_ladder_entries
+
+
+CHARACTERS = 300
+
+
+
+
+def snapshot(entries: list) -> Ladder:
+
+    return Ladder.from_snapshot(
+        LadderColumns.from_page(entries).to_frame(),
+        {
+            "loaded_at": time(),
+            "syncs_since_full": 0
+        }
+    )
+
+
+
+
+def test_max_depth_solo_is_zero_without_depth():
+
+    entries = make_ladder_entries(CHARACTERS)
+
+    for entry in entries:
+        entry["character"].pop("depth", None)
+
+    ladder = snapshot(entries)
+    ladder.compute_all()
+
+    assert ladder.max_depth_solo == 0
+
+
+
+
+def test_max_depth_solo_reads_the_deepest_character():
+
+    entries = make_ladder_entries(CHARACTERS)
+
+    ladder = snapshot(entries)
+
+    assert ladder.max_depth_solo == max(
+        entry["character"]["depth"]["solo"]
+        for entry in entries
+        if "depth" in entry["character"]
+    )
+    assert isinstance(ladder.max_depth_solo, int)
@@ -0,0 +1,165 @@
+import copy
+
+import pandas as pd
+
+from analytics.ladder import Ladder
+from analytics.ladder_columns import LadderColumns
+from analytics.ladder_fetcher import LADDER_PAGE_SIZE
+from benchmarks.synthetic import make_ladder_entries
+
+
+
+
+def load(server, tmp_path, previous = None, **fetcher_options) -> Ladder:
+
+    server["requests"].clear()
+
+    return Ladder(
+        previous = previous,
+        fetcher_options = fetcher_options,
+        checkpoint_dir = str(tmp_path)
+    )
+
+
+
+
+def frame(entries: list) -> pd.DataFrame:
+
+    return LadderColumns.from_page(entries).to_frame()
+
+
+
+
+def comparable(df: pd.DataFrame) -> pd.DataFrame:
+
+    return df.astype(
+        {
+            column: object
+            for column in LadderColumns.dictionary_columns
+        }
+    ).reset_index(
+        drop = True
+    )
+
+
+
+
+def test_is_page_stable_detects_in_place_changes():
+
+    entries = make_ladder_entries(LADDER_PAGE_SIZE * 2)
+    snapshot = frame(entries)
+    ladder = Ladder.__new__(Ladder)
+
+    page = frame(entries[LADDER_PAGE_SIZE:])
+
+    assert ladder.is_page_stable(snapshot, LADDER_PAGE_SIZE, page)
+
+    changed = copy.deepcopy(entries[LADDER_PAGE_SIZE:])
+    changed[10]["character"]["level"] -= 1
+    changed[20]["dead"] = not changed[20]["dead"]
+
+    assert not ladder.is_page_stable(snapshot, LADDER_PAGE_SIZE, frame(changed))
+    assert not ladder.is_page_stable(snapshot, LADDER_PAGE_SIZE, frame(entries[LADDER_PAGE_SIZE:-1]))
+    assert not ladder.is_page_stable(snapshot, LADDER_PAGE_SIZE, frame([]))
+
+
+
+
+def test_merge_pages_replaces_fetched_rows_and_keeps_the_rest():
+
+    entries = make_ladder_entries(LADDER_PAGE_SIZE * 2 + 50)
+    snapshot = frame(entries)
+
+    current = copy.deepcopy(entries)
+    current[5]["character"]["level"] += 1
+    current[-1]["dead"] = True
+    del current[-2]
+    current.append(
+        dict(current[-1], rank = len(current) + 1, character = dict(current[-1]["character"], id = "new"))
+    )
+
+    ladder = Ladder.__new__(Ladder)
+    ladder.columns = list(snapshot.columns)
+
+    df_merged = ladder.merge_pages(
+        snapshot,
+        {
+            0: frame(current[:LADDER_PAGE_SIZE]),
+            LADDER_PAGE_SIZE * 2: frame(current[LADDER_PAGE_SIZE * 2:])
+        }
+    )
+
+    pd.testing.assert_frame_equal(
+        comparable(df_merged),
+        comparable(frame(current))
+    )
+
+
+
+
+def test_sync_merges_every_fetched_page(server, tmp_path):
+
+    previous = load(server, tmp_path)
+
+    for entry in server["entries"][LADDER_PAGE_SIZE:]:
+        entry["character"]["level"] = max(entry["character"]["level"] - 1, 1)
+
+    ladder = load(server, tmp_path, previous)
+
+    assert ladder.sync_mode == "incremental"
+    assert not ladder.is_approximate
+
+    pd.testing.assert_frame_equal(
+        comparable(ladder.df_origin),
+        comparable(frame(server["entries"]))
+    )
+
+
+
+
+def test_sync_marks_rows_below_the_stable_page_as_approximate(server, tmp_path):
+
+    previous = load(server, tmp_path)
+
+    server["entries"][0]["character"]["level"] += 1
+    server["entries"][700]["character"]["level"] += 1
+
+    ladder = load(server, tmp_path, previous, max_workers = 1)
+    fresh = frame(server["entries"])
+
+    assert server["requests"] == [0, LADDER_PAGE_SIZE]
+    assert ladder.verified_rows == LADDER_PAGE_SIZE * 2
+    assert ladder.is_approximate
+
+    pd.testing.assert_frame_equal(
+        comparable(ladder.df_origin.iloc[:LADDER_PAGE_SIZE * 2]),
+        comparable(fresh.iloc[:LADDER_PAGE_SIZE * 2])
+    )
+
+    assert ladder.df_origin["character_level"].iloc[700] == previous.df_origin["character_level"].iloc[700]
+
+
+
+
+def test_sync_never_costs_more_than_a_full_crawl(server, tmp_path):
+
+    previous = load(server, tmp_path)
+    full_requests = len(server["requests"])
+
+    server["entries"].insert(
+        0,
+        dict(server["entries"][0], character = dict(server["entries"][0]["character"], id = "new"))
+    )
+
+    for rank, entry in enumerate(server["entries"], 1):
+        entry["rank"] = rank
+
+    ladder = load(server, tmp_path, previous)
+
+    assert len(server["requests"]) <= full_requests + 1
+    assert not ladder.is_approximate
+
+    pd.testing.assert_frame_equal(
+        comparable(ladder.df_origin),
+        comparable(frame(server["entries"]))
+    )
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from analytics.player_search import NameIndex, account_key
+from analytics.sheet_ladder_join import SheetLadderJoin
+
+
+
+
+def sheet(logins: list, classes: list) -> SimpleNamespace:
+
+    df = pd.DataFrame(
+        {
+            "Логин": logins,
+            "Подкласс": classes
+        }
+    )
+
+    return SimpleNamespace(
+        df_origin = df,
+        login_index = NameIndex(df["Логин"])
+    )
+
+
+
+
+def ladder(accounts: list, classes: list) -> SimpleNamespace:
+
+    df = pd.DataFrame(
+        {
+            "account": accounts,
+            "character_class": classes,
+            "character_level": range(90, 90 + len(accounts))
+        }
+    )
+
+    return SimpleNamespace(
+        df_origin = df,
+        account_index = NameIndex(df["account"])
+    )
+
+
+
+
+def test_account_key_drops_the_ladder_suffix():
+
+    assert account_key(" Account_7#0007 ") == "account_7"
+    assert account_key("account#name") == "account#name"
+
+
+
+
+def test_account_rows_match_with_and_without_suffix():
+
+    index = NameIndex(pd.Series(["Foo#0001", "bar#0002", "foo#0003", "Baz"]))
+
+    assert list(index.account_rows("foo#0001")) == [0]
+    assert list(index.account_rows("FOO")) == [0, 2]
+    assert list(index.account_rows("baz#1234")) == [3]
+    assert list(index.account_rows("qux")) == []
+
+
+
+
+def test_join_matches_sheet_logins_to_suffixed_accounts():
+
+    join = SheetLadderJoin(
+        sheet(
+            ["Foo", "bar#0002", "qux"],
+            ["Titan", "Witch", "Titan"]
+        ),
+        ladder(
+            ["foo#0001", "foo#0001", "bar#0002", "zed#0004"],
+            ["Titan", "Warbringer", "Lich", "Titan"]
+        )
+    )
+
+    join.compute_all()
+
+    assert join.is_warm
+    assert join.matched_players == 2
+    assert list(join.df_unmatched_sheet["Логин"]) == ["qux"]
+    assert list(join.df_unmatched_ladder["Аккаунт"]) == ["zed#0004"]
+    assert list(join.df_class_mismatch["Логин"]) == ["bar#0002"]
+    assert list(join.df_class_mismatch["Подклассы в ладдере"]) == ["Lich"]
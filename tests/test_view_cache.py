@@ -0,0 +1,30 @@
+from view_cache import ViewCache
+
+
+
+
+def test_get_keys_entries_on_the_callers_version():
+
+    cache = ViewCache()
+    cache.set_version("new")
+
+    assert cache.get("old", "panel", (), lambda: "old view") == "old view"
+    assert cache.get("new", "panel", (), lambda: "new view") == "new view"
+    assert cache.get("new", "panel", (), lambda: "recomputed") == "new view"
+
+    assert cache.hits["panel"] == 1
+    assert all(key[0] == "new" for key in cache.entries)
+
+
+
+
+def test_set_version_evicts_older_entries():
+
+    cache = ViewCache()
+    cache.set_version("old")
+
+    cache.get("old", "panel", (), lambda: "old view")
+    cache.set_version("new")
+
+    assert not cache.entries
+    assert cache.get("new", "panel", (), lambda: "new view") == "new view"
@@ -0,0 +1,103 @@
+from collections import Counter, OrderedDict
+from threading import Lock
+
+from analytics.instrumentation import instrumentation, stage
+
+
+
+
+def normalize_selection(*selections) -> tuple:
+
+    return tuple(
+        tuple(sorted(set(selection)))
+        for selection in selections
+    )
+
+
+
+
+class ViewCache():
+
+    def __init__(self, max_size: int = 512) -> None:
+
+        self.max_size = max_size
+
+        self.entries = OrderedDict()
+        self.version = None
+
+        self.hits = Counter()
+        self.misses = Counter()
+
+        self.lock = Lock()
+
+
+
+
+    def set_version(self, version):
+
+        with self.lock:
+
+            if version == self.version:
+                return
+
+            self.version = version
+
+            for key in [key for key in self.entries if key[0] != version]:
+                del self.entries[key]
+
+
+
+
+    def get(self, version, panel: str, selection: tuple, compute):
+
+        key = (version, panel, selection)
+
+        with self.lock:
+
+            if key in self.entries:
+
+                self.entries.move_to_end(key)
+                self.hits[panel] += 1
+
+                instrumentation.record(
+                    f"ViewCache.{panel}",
+                    hit = True
+                )
+
+                return self.entries[key]
+
+        with stage(f"ViewCache.{panel}") as record:
+
+            record.hit = False
+
+            value = compute()
+
+        with self.lock:
+
+            self.misses[panel] += 1
+
+            if key[0] == self.version:
+
+                self.entries[key] = value
+
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last = False)
+
+        return value
+
+
+
+
+    def hit_rate(self, panel: "str | None" = None) -> float:
+
+        if panel is None:
+
+            hits = sum(self.hits.values())
+            total = hits + sum(self.misses.values())
+
+        else:
+
+            hits = self.hits[panel]
+            total = hits + self.misses[panel]
+
+        return hits / total if total else 0.0